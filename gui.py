@@ -1,3 +1,6 @@
+import time
+startup_begin = time.perf_counter()
+
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import font as tkfont, colorchooser
@@ -10,6 +13,7 @@ from myrsa import RSA
 from range_window import RangeWindow
 from send_window import SendWindow
 from show_window import ShowWindow
+from sign_window import SignWindow
 
 
 class RSAProgram(ctk.CTk):
@@ -20,12 +24,12 @@ class RSAProgram(ctk.CTk):
         self.apply_styling()
 
     def setup_initial_config(self):
-        self.lang, self.appearance = setting.parse_cli()
+        self.lang, self.appearance, self.show_timing = setting.parse_cli()
         ctk.set_appearance_mode(self.appearance)
         self.title("RSA")
         self.resizable(0, 0)
 
-        w, h = 280, 300
+        w, h = 280, 360
         x = (self.winfo_screenwidth() - w) // 2
         y = (self.winfo_screenheight() - h) // 2
         self.geometry(f"{w}x{h}+{x}+{y}")
@@ -38,7 +42,10 @@ class RSAProgram(ctk.CTk):
         self.menu_font = tkfont.Font(family="Segoe UI", size=14)
 
         self.rsa_start, self.rsa_end = 1000, 10000
-        self.rsa = RSA(self.rsa_start, self.rsa_end)
+        self.rsa_prime_count = 2
+        self.rsa_key_bits = None
+        self.rsa = RSA(self.rsa_start, self.rsa_end, self.rsa_prime_count)
+        self.rsa.enable_key_pool()
 
         self.open_windows = []
 
@@ -262,6 +269,7 @@ class RSAProgram(ctk.CTk):
         buttons_config = [
             ("send", self.open_send_window, setting.primary_bg, setting.primary_abg),
             ("show", self.open_show_window, setting.primary_bg, setting.primary_abg),
+            ("sign", self.open_sign_window, setting.primary_bg, setting.primary_abg),
             ("interval", self.open_range_window, setting.succses_bg, setting.success_abg),
             ("close", self.confirm_exit, setting.close_bg, setting.close_abg)
         ]
@@ -585,6 +593,9 @@ class RSAProgram(ctk.CTk):
     def open_show_window(self):
         self.open_child_window(ShowWindow)
 
+    def open_sign_window(self):
+        self.open_child_window(SignWindow)
+
     def open_range_window(self):
         self.open_child_window(RangeWindow)
 
@@ -599,4 +610,7 @@ class RSAProgram(ctk.CTk):
 
 
 if __name__ == "__main__":
-    RSAProgram().mainloop()
+    app = RSAProgram()
+    if app.show_timing:
+        app.after_idle(lambda: print(f"startup: {(time.perf_counter() - startup_begin) * 1000:.0f} ms"))
+    app.mainloop()
@@ -1,39 +1,1209 @@
+import base64
+import codecs
+import hashlib
+import hmac
+import io
 import math
+import mmap
+import os
 import random
-from sympy import isprime
+import re
+import secrets
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from itertools import chain, compress
+
+def factor_name(index):
+    # نام‌گذاری عامل‌ها مانند RFC 8017: p و q و سپس r3، r4، ...
+    if index == 0:
+        return "p"
+    if index == 1:
+        return "q"
+    return f"r{index + 1}"
+
+MODE_CHAR = "char"
+MODE_BLOCK = "block"
+MODE_HYBRID = "hybrid"
+MODE_MULTI = "multi"
+# نشانه‌ی ابتدای متن رمز در حالت‌های بلوکی و ترکیبی؛ حالت کاراکتری نشانه ندارد
+BLOCK_TAG = "B"
+HYBRID_TAG = "H"
+MULTI_TAG = "M"
+
+# حرف دوم نشانه (مثلا "Bz") روش فشرده‌سازی پیش از رمزنگاری را ثبت می‌کند
+COMPRESS_NONE = ""
+COMPRESS_ZLIB = "z"
+COMPRESS_LZMA = "x"
+
+def compress_data(data, compression):
+    if compression == COMPRESS_NONE:
+        return data
+    if compression == COMPRESS_ZLIB:
+        return zlib.compress(data, 9)
+    if compression == COMPRESS_LZMA:
+        import lzma
+        return lzma.compress(data)
+    raise ValueError(f"روش فشرده‌سازی نامعتبر است: {compression}")
+
+def decompress_data(data, compression):
+    if compression == COMPRESS_NONE:
+        return data
+    if compression == COMPRESS_ZLIB:
+        return zlib.decompress(data)
+    if compression == COMPRESS_LZMA:
+        import lzma
+        return lzma.decompress(data)
+    raise ValueError(f"روش فشرده‌سازی نامعتبر است: {compression}")
+
+def make_compressor(compression):
+    # نسخه‌ی جریانی compress_data برای رمزنگاری فایل‌ها بدون نگه داشتن کل متن
+    if compression == COMPRESS_NONE:
+        return None
+    if compression == COMPRESS_ZLIB:
+        return zlib.compressobj(9)
+    if compression == COMPRESS_LZMA:
+        import lzma
+        return lzma.LZMACompressor()
+    raise ValueError(f"روش فشرده‌سازی نامعتبر است: {compression}")
+
+def make_decompressor(compression):
+    if compression == COMPRESS_NONE:
+        return None
+    if compression == COMPRESS_ZLIB:
+        return zlib.decompressobj()
+    if compression == COMPRESS_LZMA:
+        import lzma
+        return lzma.LZMADecompressor()
+    raise ValueError(f"روش فشرده‌سازی نامعتبر است: {compression}")
+
+def iter_decompressed(decompressor, data, limit):
+    # خروجی در تکه‌های حداکثر limit بایتی داده می‌شود تا نسبت فشرده‌سازی بالا حافظه را منفجر نکند
+    if decompressor.eof:
+        if data:
+            raise ValueError("پس از پایان داده‌ی فشرده، داده‌ی اضافه هست")
+        return
+    output = decompressor.decompress(data, limit)
+    while True:
+        yield output
+        if hasattr(decompressor, "unconsumed_tail"):
+            if not decompressor.unconsumed_tail:
+                return
+            output = decompressor.decompress(decompressor.unconsumed_tail, limit)
+        else:
+            if decompressor.needs_input or decompressor.eof:
+                return
+            output = decompressor.decompress(b"", limit)
+
+# جداکننده‌ها فقط همین‌جا تعریف می‌شوند: ویرگول و فاصله‌های ASCII (همان‌هایی که bytes.split() می‌شناسد)
+TOKEN_SEPARATORS = b", \t\n\r\x0b\x0c"
+TEXT_SEPARATORS = TOKEN_SEPARATORS.decode("ascii")
+SEPARATOR_BYTES = tuple(bytes([separator]) for separator in TOKEN_SEPARATORS)
+TOKEN_PATTERN = re.compile(b"[^" + re.escape(TOKEN_SEPARATORS) + b"]+")
+SEPARATOR_PATTERN = re.compile(b"[" + re.escape(TOKEN_SEPARATORS) + b"]")
+SEPARATORS_TO_SPACE = bytes.maketrans(TOKEN_SEPARATORS, b" " * len(TOKEN_SEPARATORS))
+# فاصله‌های یونیکد (مثل \xa0 در متن docx/pdf) را str.split() جداکننده می‌دانست؛ به همان تعداد بایت فاصله‌ی ساده
+# تبدیل می‌شوند تا موقعیت‌های بایتی گزارش خطا جابه‌جا نشوند
+UNICODE_SPACES = str.maketrans({
+    char: " " * len(char.encode("utf-8")) for char in map(chr, range(0x3001)) if char.isspace()
+})
+TOKEN_DIGITS = b"0123456789"
+# همه‌ی رقم‌ها به یک نویسه نگاشته می‌شوند تا توکن 19 رقمی (شاید بزرگتر از int64) با یک جستجو پیدا شود
+DIGITS_TO_MARK = bytes.maketrans(TOKEN_DIGITS, b"d" * len(TOKEN_DIGITS))
+WIDE_TOKEN = b"d" * 19
+MALFORMED_REPORT = 5
+
+def normalize_separators(text):
+    return text if text.isascii() else text.translate(UNICODE_SPACES)
+
+def normalize_token_bytes(data):
+    # طول بایتی حفظ می‌شود تا موقعیت توکن‌ها در فایل (فهرست و گزارش خطا) درست بماند
+    if data.isascii():
+        return data
+    return normalize_separators(data.decode("utf-8", "surrogateescape")).encode("utf-8", "surrogateescape")
+
+def find_malformed_tokens(data, offset=0):
+    return [
+        (offset + match.start(), match.group().decode("ascii", "replace"))
+        for match in TOKEN_PATTERN.finditer(data)
+        if not match.group().isdigit()
+    ]
+
+class TokenParser:
+    # پنجره‌های پشت‌سرهم یک فایل را می‌گیرد؛ حالت پیام از اولین توکن تعیین می‌شود
+    def __init__(self, offset=0):
+        self.offset = offset
+        self.started = False
+        self.textual = False
+
+    def parse(self, data):
+        offset = self.offset
+        self.offset += len(data)
+        tokens = []
+        data = normalize_token_bytes(data)
+
+        if not self.started:
+            match = TOKEN_PATTERN.search(data)
+            if match is None:
+                return tokens
+            self.started = True
+            if not match.group().isdigit():
+                tag = match.group().decode("ascii", "replace")
+                # پیام‌های ترکیبی نام الگوریتم، اثر انگشت و متن base64 هم دارند
+                self.textual = tag[:1] in (HYBRID_TAG, MULTI_TAG)
+                tokens.append(tag)
+                offset += match.end()
+                data = data[match.end():]
+
+        if self.textual:
+            return tokens + [
+                int(part) if part.isdigit() else part.decode("ascii")
+                for part in data.translate(SEPARATORS_TO_SPACE).split()
+            ]
+
+        # یک گذر C روی کل پنجره: غیر از رقم و جداکننده چیزی نباید باشد
+        if data.translate(None, TOKEN_DIGITS + TOKEN_SEPARATORS):
+            malformed = find_malformed_tokens(data, offset)
+            details = ", ".join(f"{position}: {token!r}" for position, token in malformed[:MALFORMED_REPORT])
+            raise ValueError(f"{len(malformed)} توکن نامعتبر در متن رمز (موقعیت بایتی: {details})")
+        return tokens + self.parse_numbers(data)
+
+    def parse_numbers(self, data):
+        if not data.strip(TOKEN_SEPARATORS):
+            # fromstring برای پنجره‌ی خالی از رقم یک صفر ساختگی برمی‌گرداند
+            return []
+
+        np = load_numpy()
+        # کلیدهای بزرگ از همان توکن اول معلوم‌اند و نگاشت کامل لازم نیست
+        first = TOKEN_PATTERN.search(data)
+        narrow = first is not None and len(first.group()) < len(WIDE_TOKEN)
+        if np is not None and narrow and WIDE_TOKEN not in data.translate(DIGITS_TO_MARK):
+            # همه‌ی توکن‌ها در int64 جا می‌شوند؛ تبدیل یکجا در NumPy انجام می‌شود
+            return np.fromstring(data.translate(SEPARATORS_TO_SPACE), dtype=np.int64, sep=" ").tolist()
+        return list(map(int, data.translate(SEPARATORS_TO_SPACE).split()))
+
+def iter_token_batches(chunks):
+    # توکن نیمه‌کاره‌ی انتهای هر تکه نگه داشته می‌شود؛ فقط تکه‌ی تازه برای جداکننده جستجو می‌شود
+    # تا توکن بسیار بلند (بار پیام ترکیبی) در هر تکه دوباره کپی و پیمایش نشود
+    parser = TokenParser()
+    pending = []
+    for chunk in chunks:
+        chunk = normalize_separators(chunk)
+        cut = max(chunk.rfind(separator) for separator in TEXT_SEPARATORS) + 1
+        if not cut:
+            pending.append(chunk)
+            continue
+
+        pending.append(chunk[:cut])
+        batch = parser.parse("".join(pending).encode("utf-8"))
+        pending = [chunk[cut:]]
+        if batch:
+            yield batch
+
+    tail = "".join(pending)
+    if tail:
+        yield parser.parse(tail.encode("utf-8"))
+
+# قالب دودویی: سرآیند، سپس تکه‌هایی از توکن‌های هم‌عرض big-endian که هرکدام CRC32 خود را دارند
+CONTAINER_MAGIC = b"RSAC"
+CONTAINER_VERSION = 1
+CONTAINER_HEADER = struct.Struct(">4sBBH8sQI")
+CONTAINER_CHUNK = 4096
+CONTAINER_KINDS = ("", BLOCK_TAG)
+CONTAINER_COMPRESSIONS = (COMPRESS_NONE, COMPRESS_ZLIB, COMPRESS_LZMA)
+
+def is_container(data):
+    return bytes(data[:len(CONTAINER_MAGIC)]) == CONTAINER_MAGIC
+
+def write_container(output, tokens, n, chunk_tokens=CONTAINER_CHUNK):
+    tokens = list(tokens)
+    tag = tokens.pop(0) if tokens and isinstance(tokens[0], str) else ""
+    kind, compression = tag[:1], tag[1:]
+    if kind not in CONTAINER_KINDS or compression not in CONTAINER_COMPRESSIONS:
+        raise ValueError("قالب دودویی فقط حالت‌های کاراکتری و بلوکی را نگه می‌دارد")
+
+    width = (n.bit_length() + 7) // 8
+    flags = CONTAINER_KINDS.index(kind) | CONTAINER_COMPRESSIONS.index(compression) << 2
+    fingerprint = bytes.fromhex(key_fingerprint(n)[1:])
+    output.write(CONTAINER_HEADER.pack(
+        CONTAINER_MAGIC, CONTAINER_VERSION, flags, width, fingerprint, len(tokens), chunk_tokens
+    ))
+
+    for offset in range(0, len(tokens), chunk_tokens):
+        body = b"".join(int(token).to_bytes(width, "big") for token in tokens[offset:offset + chunk_tokens])
+        output.write(body)
+        output.write(struct.pack(">I", zlib.crc32(body)))
+
+def check_container(view):
+    # همه‌ی CRCها پیش از هر رمزگشایی بررسی می‌شوند تا فایل خراب زود رد شود
+    if len(view) < CONTAINER_HEADER.size or not is_container(view):
+        raise ValueError("فایل در قالب دودویی نیست")
+
+    _, version, flags, width, fingerprint, count, chunk_tokens = CONTAINER_HEADER.unpack_from(view)
+    if version != CONTAINER_VERSION:
+        raise ValueError(f"نسخه‌ی قالب دودویی پشتیبانی نمی‌شود: {version}")
+    if width < 1 or chunk_tokens < 1 or flags & 3 >= len(CONTAINER_KINDS) or flags >> 2 >= len(CONTAINER_COMPRESSIONS):
+        raise ValueError("سرآیند قالب دودویی نامعتبر است")
+
+    chunk_count = -(-count // chunk_tokens)
+    if len(view) != CONTAINER_HEADER.size + count * width + chunk_count * 4:
+        raise ValueError("طول فایل دودویی با سرآیند آن نمی‌خواند")
+
+    bodies = []
+    position = CONTAINER_HEADER.size
+    for index in range(chunk_count):
+        size = min(chunk_tokens, count - index * chunk_tokens) * width
+        body = view[position:position + size]
+        (checksum,) = struct.unpack_from(">I", view, position + size)
+        if zlib.crc32(body) != checksum:
+            raise ValueError(f"CRC تکه‌ی {index} نادرست است؛ فایل خراب شده است")
+        bodies.append(body)
+        position += size + 4
+
+    tag = CONTAINER_KINDS[flags & 3] + CONTAINER_COMPRESSIONS[flags >> 2]
+    return "k" + fingerprint.hex(), tag, width, bodies
+
+def iter_container_batches(tag, width, bodies, progress=None):
+    # توکن‌ها مستقیما از برش‌های memoryview خوانده می‌شوند؛ هر تکه‌ی CRC یک دسته است
+    if tag:
+        yield [tag]
+    for index, body in enumerate(bodies):
+        yield [int.from_bytes(body[i:i + width], "big") for i in range(0, len(body), width)]
+        if progress:
+            progress((index + 1) / len(bodies))
+
+def regroup_batches(batches, size):
+    # دسته‌های کوچک (پنجره‌ی mmap یا تکه‌ی CRC) تا رسیدن به size توکن به هم چسبانده می‌شوند
+    group = []
+    for batch in batches:
+        group += batch
+        if len(group) >= size:
+            yield group
+            group = []
+    if group:
+        yield group
+
+def release_views(views):
+    for view in views:
+        view.release()
+
+def read_container(data):
+    with memoryview(data) as view:
+        fingerprint, tag, width, bodies = check_container(view)
+        try:
+            tokens = list(chain.from_iterable(iter_container_batches(tag, width, bodies)))
+        finally:
+            release_views(bodies)
+    return fingerprint, tokens
+
+# زره متنی: قالب دودویی (یا متن توکن‌ها) در base64url با خطوط کوتاه تا از docx/pdf سالم عبور کند
+ARMOR_BEGIN = "-----BEGIN RSA MESSAGE-----"
+ARMOR_END = "-----END RSA MESSAGE-----"
+ARMOR_LINE = 76
+ARMOR_CONTAINER = 0
+ARMOR_TOKENS = 1
+ARMOR_ZLIB = 0x80
+
+def is_armored(text):
+    return text.lstrip().startswith(ARMOR_BEGIN)
+
+def armor_tokens(tokens, n):
+    tokens = list(tokens)
+    try:
+        output = io.BytesIO()
+        write_container(output, tokens, n)
+        kind, payload = ARMOR_CONTAINER, output.getvalue()
+    except ValueError:
+        # حالت‌های ترکیبی توکن متنی دارند و به همان شکل متنی زره‌پوش می‌شوند
+        kind, payload = ARMOR_TOKENS, ",".join(map(str, tokens)).encode("ascii")
+
+    # zlib فقط وقتی نگه داشته می‌شود که واقعا حجم را کم کند
+    compressed = zlib.compress(payload, 9)
+    if len(compressed) < len(payload):
+        kind, payload = kind | ARMOR_ZLIB, compressed
+
+    encoded = base64.urlsafe_b64encode(bytes([kind]) + payload).decode("ascii")
+    lines = [encoded[i:i + ARMOR_LINE] for i in range(0, len(encoded), ARMOR_LINE)]
+    return "\n".join([ARMOR_BEGIN] + lines + [ARMOR_END])
+
+def dearmor(text):
+    # خروجی: (اثر انگشت یا None، توکن‌ها)
+    text = text.strip()
+    if not text.startswith(ARMOR_BEGIN) or not text.endswith(ARMOR_END):
+        raise ValueError("متن زره‌پوش کامل نیست")
+
+    # pdf و docx ممکن است فاصله یا شکست خط اضافه کنند
+    body = "".join(text[len(ARMOR_BEGIN):-len(ARMOR_END)].split())
+    raw = base64.urlsafe_b64decode(body + "=" * (-len(body) % 4))
+    if not raw:
+        raise ValueError("متن زره‌پوش خالی است")
+
+    kind, payload = raw[0], raw[1:]
+    if kind & ARMOR_ZLIB:
+        payload = zlib.decompress(payload)
+        kind &= ~ARMOR_ZLIB
+
+    if kind == ARMOR_CONTAINER:
+        return read_container(payload)
+    if kind == ARMOR_TOKENS:
+        return None, list(chain.from_iterable(iter_token_batches([payload.decode("ascii")])))
+    raise ValueError(f"نوع زره ناشناخته است: {kind}")
+
+# فهرست کناری: موقعیت بایتی هر INDEX_STRIDE امین توکن فایل متنی، برای رمزگشایی بخشی از فایل
+INDEX_EXT = ".idx"
+INDEX_MAGIC = b"RSAI"
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct(">4sBBIQQQ")
+INDEX_STRIDE = 1024
+INDEX_READ = 1 << 20
+RANGE_READ = 1 << 14
+
+def get_index_path(path):
+    return path + INDEX_EXT
+
+def build_token_index(path, stride=INDEX_STRIDE):
+    offsets = array("Q")
+    count = 0
+    tagged = False
+    pending = []
+    with open(path, "rb") as file:
+        head = file.read(len(codecs.BOM_UTF8))
+        if head[:2] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE):
+            raise ValueError("دسترسی بخشی برای متن UTF-16 ممکن نیست")
+        # نشانه‌ی BOM جزو توکن اول نیست؛ موقعیت‌ها از بعد از آن شمرده می‌شوند
+        base = len(head) if head == codecs.BOM_UTF8 else 0
+        file.seek(base)
+        while True:
+            chunk = normalize_token_bytes(file.read(INDEX_READ))
+
+            # توکن آخر ممکن است در تکه‌ی بعد ادامه داشته باشد؛ فقط تکه‌ی تازه جستجو می‌شود
+            cut = len(chunk)
+            if chunk:
+                cut = max(chunk.rfind(separator) for separator in SEPARATOR_BYTES) + 1
+                if not cut:
+                    pending.append(chunk)
+                    continue
+
+            pending.append(chunk[:cut])
+            # نویسه‌ی چندبایتی که بین دو تکه بریده شده فقط پس از پیوستن شناخته می‌شود
+            text = normalize_token_bytes(b"".join(pending))
+            for match in TOKEN_PATTERN.finditer(text):
+                if count == 0:
+                    tagged = not match.group().isdigit()
+                if count % stride == 0:
+                    offsets.append(base + match.start())
+                count += 1
+
+            base += len(text)
+            pending = [chunk[cut:]]
+            if not chunk:
+                break
+
+    stat = os.stat(path)
+    header = INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, tagged, stride, stat.st_size, stat.st_mtime_ns, count)
+    stored = array("Q", offsets)
+    if sys.byteorder == "little":
+        stored.byteswap()
+    try:
+        with open(get_index_path(path), "wb") as file:
+            file.write(header)
+            file.write(stored.tobytes())
+    except OSError:
+        # پوشه‌ی فقط‌خواندنی: فهرست فقط برای همین درخواست در حافظه می‌ماند
+        pass
+    return {"tagged": tagged, "stride": stride, "count": count, "offsets": offsets}
+
+def load_token_index(path):
+    # فهرست کهنه (اندازه یا زمان تغییر متفاوت) دوباره ساخته می‌شود
+    try:
+        with open(get_index_path(path), "rb") as file:
+            data = file.read()
+        magic, version, tagged, stride, size, mtime, count = INDEX_HEADER.unpack_from(data)
+        stat = os.stat(path)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION or (size, mtime) != (stat.st_size, stat.st_mtime_ns):
+            raise ValueError("stale index")
+        offsets = array("Q")
+        offsets.frombytes(data[INDEX_HEADER.size:])
+        if sys.byteorder == "little":
+            offsets.byteswap()
+        if len(offsets) != -(-count // stride):
+            raise ValueError("broken index")
+        return {"tagged": bool(tagged), "stride": stride, "count": count, "offsets": offsets}
+    except (OSError, ValueError, struct.error):
+        return build_token_index(path)
+
+def read_token_range(path, start, end):
+    # فقط تکه‌ای از فایل که توکن‌های [start, end) در آن است خوانده می‌شود
+    index = load_token_index(path)
+    if index["tagged"]:
+        raise ValueError("دسترسی بخشی فقط برای پیام‌های حالت کاراکتری ممکن است")
+    start, end = max(start, 0), min(end, index["count"])
+    if start >= end:
+        return []
+
+    stride = index["stride"]
+    skip = start % stride
+    tokens = []
+
+    def chunks(file):
+        while True:
+            chunk = file.read(RANGE_READ)
+            if not chunk:
+                return
+            yield chunk
+
+    with open(path, "rb") as file:
+        file.seek(index["offsets"][start // stride])
+        # نویسه‌ی چندبایتی (مثل \xa0) ممکن است بین دو تکه بریده شود
+        for batch in iter_token_batches(codecs.iterdecode(chunks(file), "utf-8", "replace")):
+            if skip >= len(batch):
+                skip -= len(batch)
+                continue
+            tokens += batch[skip:skip + end - start - len(tokens)]
+            skip = 0
+            if len(tokens) >= end - start:
+                break
+    return tokens
+
+def read_container_range(path, start, end):
+    # در قالب دودویی موقعیت هر توکن از سرآیند محاسبه می‌شود و فهرست لازم نیست
+    with open(path, "rb") as file:
+        header = file.read(CONTAINER_HEADER.size)
+        if len(header) < CONTAINER_HEADER.size or not is_container(header):
+            raise ValueError("فایل در قالب دودویی نیست")
+        _, version, flags, width, fingerprint, count, chunk_tokens = CONTAINER_HEADER.unpack(header)
+        if version != CONTAINER_VERSION:
+            raise ValueError(f"نسخه‌ی قالب دودویی پشتیبانی نمی‌شود: {version}")
+        if flags != 0:
+            raise ValueError("دسترسی بخشی فقط برای پیام‌های حالت کاراکتری ممکن است")
+
+        start, end = max(start, 0), min(end, count)
+        tokens = []
+        for index in range(start // chunk_tokens, -(-end // chunk_tokens) if start < end else 0):
+            first = index * chunk_tokens
+            size = min(chunk_tokens, count - first) * width
+            file.seek(CONTAINER_HEADER.size + first * width + index * 4)
+            data = file.read(size + 4)
+            view = memoryview(data)
+            if len(data) != size + 4 or zlib.crc32(view[:size]) != struct.unpack_from(">I", view, size)[0]:
+                raise ValueError(f"CRC تکه‌ی {index} نادرست است؛ فایل خراب شده است")
+
+            low, high = max(start - first, 0), min(end - first, size // width)
+            tokens += [int.from_bytes(view[i * width:(i + 1) * width], "big") for i in range(low, high)]
+    return "k" + fingerprint.hex(), tokens
+
+def iter_mapped_token_batches(mapped, start=0, buffer_size=1 << 16, progress=None):
+    # هر بار فقط یک پنجره‌ی buffer_size بایتی از نگاشت برداشته می‌شود و کل فایل هرگز رشته‌ی پایتون نمی‌شود
+    size = len(mapped)
+    position = start
+    parser = TokenParser(start)
+    while position < size:
+        end = min(position + buffer_size, size)
+        if end < size:
+            # پنجره تا آخرین جداکننده کوتاه می‌شود تا توکنی نصف نشود
+            cut = max(mapped.rfind(separator, position, end) for separator in SEPARATOR_BYTES)
+            if cut < position:
+                match = SEPARATOR_PATTERN.search(mapped, end)
+                cut = match.start() if match else size - 1
+            end = cut + 1
+
+        batch = parser.parse(mapped[position:end])
+        position = end
+        if batch:
+            yield batch
+        if progress:
+            progress(position / size)
+
+STREAM_CHUNK = 1 << 16
+SIGN_CHUNK = 1 << 20
+# پیشوند DigestInfo برای SHA-256 در لایه‌گذاری امضای PKCS#1 v1.5
+SHA256_DIGEST_INFO = bytes.fromhex("3031300d060960864801650304020105000420")
+# لایه‌گذاری PKCS#1 v1.5 (امضا و کلید جلسه): دو بایت آغاز، حداقل 8 بایت پرکننده، یک بایت صفر
+WRAP_PADDING_MIN = 11
+
+def hash_file(path, chunk_size=SIGN_CHUNK, progress=None):
+    # خواندن تکه‌تکه در یک بافر ثابت تا حافظه برای فایل‌های چند گیگابایتی محدود بماند
+    digest = hashlib.sha256()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    total = os.path.getsize(path) or 1
+    done = 0
+    with open(path, "rb") as file:
+        while True:
+            count = file.readinto(buffer)
+            if not count:
+                break
+            digest.update(view[:count])
+            done += count
+            if progress:
+                progress(min(done / total, 1.0))
+    return digest.digest()
+
+SESSION_KEY_SIZE = 32
+NONCE_SIZE = 12
+SYMMETRIC_CHUNK = 1 << 20
+ALGO_AESGCM = "aesgcm"
+ALGO_SHAKE_HMAC = "shake-hmac"
+
+def load_aesgcm():
+    try:
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    except ImportError:
+        return None
+    return AESGCM
+
+def symmetric_algorithm():
+    return ALGO_AESGCM if load_aesgcm() is not None else ALGO_SHAKE_HMAC
+
+def shake_keystream_xor(key, nonce, data):
+    # جایگزین بدون وابستگی: جریان کلید SHAKE-256 برای هر مگابایت با شمارنده
+    output = bytearray()
+    for offset in range(0, len(data), SYMMETRIC_CHUNK):
+        chunk = data[offset:offset + SYMMETRIC_CHUNK]
+        counter = (offset // SYMMETRIC_CHUNK).to_bytes(8, "big")
+        stream = hashlib.shake_256(key + nonce + counter).digest(len(chunk))
+        mixed = int.from_bytes(chunk, "big") ^ int.from_bytes(stream, "big")
+        output += mixed.to_bytes(len(chunk), "big")
+    return bytes(output)
+
+def split_session_key(session_key):
+    return (
+        hashlib.sha256(b"enc" + session_key).digest(),
+        hashlib.sha256(b"mac" + session_key).digest(),
+    )
+
+def symmetric_encrypt(session_key, data):
+    nonce = secrets.token_bytes(NONCE_SIZE)
+    AESGCM = load_aesgcm()
+    if AESGCM is not None:
+        return ALGO_AESGCM, nonce + AESGCM(session_key).encrypt(nonce, data, None)
+
+    enc_key, mac_key = split_session_key(session_key)
+    ciphertext = shake_keystream_xor(enc_key, nonce, data)
+    tag = hmac.new(mac_key, nonce + ciphertext, hashlib.sha256).digest()
+    return ALGO_SHAKE_HMAC, nonce + ciphertext + tag
+
+def symmetric_decrypt(algo, session_key, blob):
+    nonce, body = blob[:NONCE_SIZE], blob[NONCE_SIZE:]
+    if algo == ALGO_AESGCM:
+        AESGCM = load_aesgcm()
+        if AESGCM is None:
+            raise ImportError("کتابخانه‌ی cryptography برای رمزگشایی این پیام لازم است")
+        from cryptography.exceptions import InvalidTag
+        try:
+            return AESGCM(session_key).decrypt(nonce, body, None)
+        except InvalidTag:
+            raise ValueError("برچسب احراز اصالت پیام نامعتبر است")
+
+    if algo == ALGO_SHAKE_HMAC:
+        enc_key, mac_key = split_session_key(session_key)
+        ciphertext, tag = body[:-32], body[-32:]
+        expected = hmac.new(mac_key, nonce + ciphertext, hashlib.sha256).digest()
+        if not hmac.compare_digest(tag, expected):
+            raise ValueError("برچسب احراز اصالت پیام نامعتبر است")
+        return shake_keystream_xor(enc_key, nonce, ciphertext)
+
+    raise ValueError(f"الگوریتم متقارن ناشناخته است: {algo}")
+
+def key_fingerprint(n):
+    # فقط به n وابسته است تا با فایل کلید خصوصی (n,d) هم قابل محاسبه باشد
+    digest = hashlib.sha256(n.to_bytes((n.bit_length() + 7) // 8, "big")).hexdigest()
+    return "k" + digest[:16]
+
+def encode_payload(blob):
+    return base64.urlsafe_b64encode(blob).decode("ascii").rstrip("=")
+
+def decode_payload(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def factors_from_key_values(key_values):
+    factors = []
+    while factor_name(len(factors)) in key_values:
+        factors.append(key_values[factor_name(len(factors))])
+    return factors
+
+class LRUCache:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.items = OrderedDict()
+
+    def get(self, key):
+        value = self.items.get(key)
+        if value is not None:
+            self.items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        if len(self.items) > self.max_size:
+            self.items.popitem(last=False)
+
+    def clear(self):
+        self.items.clear()
+
+    def __len__(self):
+        return len(self.items)
+
+# بازه‌های بزرگتر از این مقدار غربال نمی‌شوند و مثل قبل با آزمون اول بودن انتخاب می‌شوند
+SIEVE_LIMIT = 10_000_000
+# غربال پایه تا جذر انتهای بازه می‌رود؛ برای بازه‌های خیلی بالا همان آزمون اول بودن ارزان‌تر است
+SIEVE_BASE_LIMIT = 1 << 20
+prime_tables = LRUCache(8)
+
+def build_prime_table(start, end):
+    limit = math.isqrt(end)
+    base = bytearray([1]) * (limit + 1)
+    base[0:2] = b"\x00\x00"
+    for i in range(2, math.isqrt(limit) + 1):
+        if base[i]:
+            base[i * i::i] = bytes(len(range(i * i, limit + 1, i)))
+
+    segment = bytearray([1]) * (end - start + 1)
+    for prime in compress(range(limit + 1), base):
+        first = max(prime * prime, (start + prime - 1) // prime * prime)
+        segment[first - start::prime] = bytes(len(range(first, end + 1, prime)))
+
+    # "L" در ویندوز 32 بیتی است و اعداد بزرگتر از 2**32 را نمی‌پذیرد
+    return array("Q", compress(range(start, end + 1), segment))
+
+def get_prime_table(start, end):
+    if end - start > SIEVE_LIMIT or math.isqrt(end) > SIEVE_BASE_LIMIT:
+        return None
+
+    table = prime_tables.get((start, end))
+    if table is None:
+        table = build_prime_table(start, end)
+        prime_tables.put((start, end), table)
+    return table
+
+SMALL_PRIMES = build_prime_table(2, 2000)
+SIEVE_PRIMES = build_prime_table(3, 1 << 16)
+SIZED_WINDOW = 4096
+KEY_SIZES = (1024, 2048, 3072, 4096)
+# زیر این اندازه هزینه‌ی راه‌اندازی فرایندها از جست‌وجوی موازی بیشتر است
+PARALLEL_MIN_BITS = 2048
+
+def miller_rabin_rounds(bits):
+    # تعداد دورها بر اساس جدول C.3 در FIPS 186-4 برای اعداد تصادفی
+    if bits >= 1536:
+        return 4
+    if bits >= 1024:
+        return 5
+    if bits >= 512:
+        return 7
+    return 40
+
+# برای n < 3.3 * 10^24 (و در نتیجه همه‌ی اعداد 64 بیتی) این پایه‌ها قطعی هستند
+DETERMINISTIC_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+def is_prime(n):
+    if n < 2:
+        return False
+    for prime in SMALL_PRIMES:
+        if n % prime == 0:
+            return n == prime
+
+    if n < 1 << 64:
+        return miller_rabin(n, bases=DETERMINISTIC_BASES)
+
+    # sympy اختیاری است و فقط برای اعداد بزرگ و در صورت نصب بودن بارگذاری می‌شود
+    try:
+        from sympy import isprime
+    except ImportError:
+        return miller_rabin(n)
+    return isprime(n)
+
+def miller_rabin(n, rounds=None, bases=None):
+    if bases is None:
+        if rounds is None:
+            rounds = miller_rabin_rounds(n.bit_length())
+        bases = [random.randrange(2, n - 1) for _ in range(rounds)]
+
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    for base in bases:
+        x = pow(base, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = pow(x, 2, n)
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+def sieve_window(start, size):
+    # غربال اعداد فرد start, start+2, ... با اعداد اول کوچک (چرخ تقسیم آزمایشی)
+    flags = bytearray([1]) * size
+    for prime in SIEVE_PRIMES:
+        # (prime + 1) // 2 وارون 2 به پیمانه‌ی prime است
+        first = (-start * ((prime + 1) // 2)) % prime
+        if start + 2 * first == prime:
+            first += prime
+        flags[first::prime] = bytes(len(range(first, size, prime)))
+    return flags
+
+def search_window(start, e=65537):
+    flags = sieve_window(start, SIZED_WINDOW)
+    for index in compress(range(SIZED_WINDOW), flags):
+        candidate = start + 2 * index
+        if candidate % e != 1 and miller_rabin(candidate):
+            return candidate
+    return None
+
+def find_prime_from(start, e=65537):
+    start |= 1
+    while True:
+        prime = search_window(start, e)
+        if prime:
+            return prime
+        start += 2 * SIZED_WINDOW
+
+def random_start(bits):
+    # دو بیت بالا یک هستند تا حاصل‌ضرب دقیقا به اندازه‌ی مجموع بیت‌ها باشد
+    return random.getrandbits(bits) | (3 << (bits - 2)) | 1
+
+def random_prime(bits, e=65537):
+    while True:
+        prime = find_prime_from(random_start(bits), e)
+        if prime.bit_length() == bits:
+            return prime
+
+def split_prime_sizes(bits, count):
+    return [bits // count + (1 if i < bits % count else 0) for i in range(count)]
+
+def generate_sized_primes(bits, count):
+    sizes = split_prime_sizes(bits, count)
+    while True:
+        primes = []
+        for size in sizes:
+            prime = random_prime(size)
+            while prime in primes:
+                prime = random_prime(size)
+            primes.append(prime)
+
+        if math.prod(primes).bit_length() == bits:
+            return primes
+
+def generate_sized_primes_parallel(bits, count, workers=None):
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    sizes = split_prime_sizes(bits, count)
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            needed = list(sizes)
+            primes = []
+            pending = {}
+            while needed:
+                # نقطه‌ی شروع در فرایند اصلی انتخاب می‌شود تا کارگرها پنجره‌ی تکراری نگیرند
+                while len(pending) < 2 * workers:
+                    size = needed[len(pending) % len(needed)]
+                    pending[executor.submit(search_window, random_start(size))] = size
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    size = pending.pop(future)
+                    prime = future.result()
+                    if prime and prime.bit_length() == size and size in needed and prime not in primes:
+                        needed.remove(size)
+                        primes.append(prime)
+
+            for future in pending:
+                future.cancel()
+
+            if math.prod(primes).bit_length() == bits:
+                return primes
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+# هر واحد کار موازی این تعداد توکن است؛ زیر حداقل، هزینه‌ی فرایندها بیشتر از سود است
+PARALLEL_CHUNK = 4096
+PARALLEL_MIN_ITEMS = 65536
+# بدون GIL ریسه‌ها هزینه‌ی راه‌اندازی و pickle ندارند و از دو واحد کار به بعد ارزش دارند
+THREAD_MIN_ITEMS = 2 * PARALLEL_CHUNK
+
+EXECUTOR_AUTO = "auto"
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+
+def gil_disabled():
+    # در نسخه‌های free-threaded پایتون (3.13t به بعد) GIL می‌تواند در زمان اجرا خاموش باشد
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+# تا این اندازه حاصل‌ضرب دو باقیمانده در uint64 سرریز نمی‌کند
+VECTOR_MAX_MODULUS = 1 << 32
+VECTOR_MIN_BATCH = 32
+
+def load_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+def vector_powmod(values, exponent, modulus):
+    np = load_numpy()
+    base = np.asarray(values, dtype=np.uint64) % np.uint64(modulus)
+    result = np.ones_like(base)
+    modulus = np.uint64(modulus)
+    while exponent:
+        if exponent & 1:
+            result = result * base % modulus
+        base = base * base % modulus
+        exponent >>= 1
+    return result.tolist()
+
+class PowBackend:
+    name = "pow"
+
+    def is_available(self):
+        return True
+
+    def can_vectorize(self, values, modulus):
+        # برداری‌سازی به موتور عددی وابسته نیست؛ هر جا پیمانه در uint64 جا شود NumPy به کار می‌رود
+        return (len(values) >= VECTOR_MIN_BATCH and modulus <= VECTOR_MAX_MODULUS
+                and load_numpy() is not None and max(values) < modulus)
+
+    def powmod(self, base, exponent, modulus):
+        return pow(base, exponent, modulus)
+
+    def powmod_many(self, values, exponent, modulus):
+        values = list(values)
+        if self.can_vectorize(values, modulus):
+            return vector_powmod(values, exponent, modulus)
+        return [self.powmod(value, exponent, modulus) for value in values]
+
+class Gmpy2Backend(PowBackend):
+    name = "gmpy2"
+
+    def __init__(self):
+        self.gmpy2 = None
+
+    def is_available(self):
+        if self.gmpy2 is None:
+            try:
+                import gmpy2
+            except ImportError:
+                return False
+            self.gmpy2 = gmpy2
+        return True
+
+    def powmod(self, base, exponent, modulus):
+        return int(self.gmpy2.powmod(base, exponent, modulus))
+
+BACKENDS = {backend.name: backend for backend in (PowBackend(), Gmpy2Backend())}
+active_backend = None
+
+def calibrate_backend(backend):
+    # دسته‌های کوچک همیشه برداری می‌شوند؛ فقط توان تکی با پیمانه‌ی 1024 بیتی موتورها را از هم جدا می‌کند
+    large_modulus = (1 << 1023) + 1155
+    started = time.perf_counter()
+    for base in (2, 3, 5):
+        backend.powmod(base, large_modulus - 2, large_modulus)
+    return time.perf_counter() - started
+
+def select_backend(name=None):
+    global active_backend
+    name = name or os.environ.get("RSA_BACKEND")
+    if name:
+        backend = BACKENDS.get(name)
+        if backend is None or not backend.is_available():
+            raise ValueError(f"موتور محاسبه در دسترس نیست: {name}")
+        active_backend = backend
+        return backend
+
+    candidates = [backend for backend in BACKENDS.values() if backend.is_available()]
+    active_backend = min(candidates, key=calibrate_backend)
+    return active_backend
+
+def get_backend():
+    # انتخاب با اولین استفاده انجام می‌شود تا زمان بالا آمدن برنامه افزایش نیابد
+    if active_backend is None:
+        select_backend()
+    return active_backend
+
+def draw_primes(spec):
+    # spec: ("bits", bits, count, workers) یا ("range", start, end, count)
+    if spec[0] == "bits":
+        _, bits, count, workers = spec
+        if workers > 1:
+            return generate_sized_primes_parallel(bits, count, workers)
+        return generate_sized_primes(bits, count)
+
+    _, start, end, count = spec
+    table = get_prime_table(start, end)
+    if table is not None:
+        return random.sample(table, count)
+
+    primes = []
+    while len(primes) < count:
+        candidate = random.randint(start, end)
+
+        if candidate not in primes and is_prime(candidate):
+            primes.append(candidate)
+    return primes
+
+class KeyPool:
+    def __init__(self, size=2):
+        self.size = size
+        self.spec = None
+        self.keys = deque()
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self.worker = None
+        self.lock = threading.Lock()
+
+    def configure(self, spec):
+        with self.lock:
+            if spec != self.spec:
+                self.spec = spec
+                self.keys.clear()
+                self.generation += 1
+            self.start_refill()
+
+    def invalidate(self):
+        with self.lock:
+            self.keys.clear()
+            self.generation += 1
+            self.start_refill()
+
+    def take(self, spec):
+        with self.lock:
+            if spec == self.spec and self.keys:
+                self.hits += 1
+                primes = self.keys.popleft()
+            else:
+                self.misses += 1
+                primes = None
+                if spec != self.spec:
+                    self.spec = spec
+                    self.keys.clear()
+                    self.generation += 1
+            self.start_refill()
+            return primes
+
+    def start_refill(self):
+        # فقط با قفل گرفته‌شده صدا زده می‌شود
+        if self.worker is None and self.spec is not None and len(self.keys) < self.size:
+            self.worker = threading.Thread(target=self.refill, daemon=True)
+            self.worker.start()
+
+    def refill(self):
+        while True:
+            with self.lock:
+                if self.spec is None or len(self.keys) >= self.size:
+                    self.worker = None
+                    return
+                spec, generation = self.spec, self.generation
+
+            try:
+                primes = draw_primes(spec)
+            except Exception:
+                with self.lock:
+                    self.worker = None
+                return
+
+            with self.lock:
+                # کلیدهای بازه‌ی قبلی بعد از تغییر تنظیمات دور ریخته می‌شوند
+                if generation == self.generation:
+                    self.keys.append(primes)
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "ready": len(self.keys)}
 
 class RSA:
-    def __init__(self, start=1000, end=10000):
+    CODEBOOK_SIZE = 4096
+
+    def __init__(self, start=1000, end=10000, prime_count=2):
         self.p = None
         self.q = None
+        self.primes = []
+        self.crt_extra = []
         self.n = None
         self.e = None
         self.d = None
-        self.set_prime_range(start, end)
+        self.dp = None
+        self.dq = None
+        self.q_inv = None
+        self.encrypt_codebook = LRUCache(self.CODEBOOK_SIZE)
+        self.decrypt_codebook = LRUCache(self.CODEBOOK_SIZE)
+        self.codebook_key = None
+        self.key_bits = None
+        self.workers = None
+        self.executor_mode = EXECUTOR_AUTO
+        self.key_pool = None
+        self.pool = None
+        self.pool_shared = False
+        self.set_prime_range(start, end, prime_count)
 
-    def set_prime_range(self, start, end):
+    def set_prime_range(self, start, end, prime_count=None):
         if not (isinstance(start, int) and isinstance(end, int)):
             raise TypeError("مقادیر شروع و پایان باید عدد صحیح باشند")
         if start < 2:
             raise ValueError("مقدار شروع باید بزرگتر مساوی 2 باشد")
         if end <= start + 5:
             raise ValueError("مقدار پایان باید حداقل 6 واحد بزرگتر از شروع باشد")
+        if prime_count is None:
+            prime_count = self.prime_count
+        self.check_prime_count(prime_count)
+
+        table = get_prime_table(start, end)
+        self.check_table_size(table, prime_count)
             
         self.start_number = start
         self.end_number = end
+        self.prime_count = prime_count
+        self.prime_table = table
+        self.key_bits = None
+        self.clear_keys()
+        self.refresh_key_pool()
         return self
 
-    def generate_prime_numbers(self):
-        flag=False
-        while flag==False:
-            self.p = random.randint(self.start_number, self.end_number)
-            self.q = random.randint(self.start_number, self.end_number)
-            
-            if self.p != self.q and isprime(self.p) and isprime(self.q):
-                flag=True
+    def set_key_size(self, bits, prime_count=None):
+        if not isinstance(bits, int):
+            raise TypeError("اندازه‌ی کلید باید عدد صحیح باشد")
+        if prime_count is None:
+            prime_count = self.prime_count
+        self.check_prime_count(prime_count)
+        if bits < 64 or bits // prime_count < 16:
+            raise ValueError("اندازه‌ی کلید برای این تعداد عامل اول خیلی کوچک است")
+
+        self.key_bits = bits
+        self.prime_count = prime_count
+        self.prime_table = None
+        self.clear_keys()
+        self.refresh_key_pool()
+        return self
+
+    def set_prime_count(self, count):
+        self.check_prime_count(count)
+        self.check_table_size(self.prime_table, count)
+
+        self.prime_count = count
+        self.clear_keys()
+        self.refresh_key_pool()
+        return self
+
+    def clear_keys(self):
+        # کلید قبلی با تنظیمات جدید نمی‌خواند؛ رمزگذاری بعدی کلید تازه (از استخر) می‌گیرد
+        self.p = self.q = None
+        self.primes = []
+        self.n = self.e = self.d = None
+        self.calculate_crt_values()
+
+    def set_workers(self, workers):
+        if workers is not None and (not isinstance(workers, int) or workers < 1):
+            raise ValueError("تعداد کارگرها باید عدد صحیح مثبت باشد")
+
+        self.workers = workers
+        self.refresh_key_pool()
+        return self
+
+    def enable_key_pool(self, size=2):
+        self.key_pool = KeyPool(size)
+        self.refresh_key_pool()
+        return self
+
+    def refresh_key_pool(self):
+        if self.key_pool is not None:
+            self.key_pool.configure(self.get_prime_spec())
+
+    def get_key_pool_stats(self):
+        if self.key_pool is None:
+            return {"hits": 0, "misses": 0, "ready": 0}
+        return self.key_pool.stats()
+
+    def get_worker_count(self):
+        return self.workers or os.cpu_count() or 1
+
+    def set_executor_mode(self, mode):
+        if mode not in (EXECUTOR_AUTO, EXECUTOR_THREAD, EXECUTOR_PROCESS):
+            raise ValueError(f"حالت اجرای موازی نامعتبر است: {mode}")
+
+        self.executor_mode = mode
+        return self
+
+    def get_executor_mode(self):
+        if self.executor_mode != EXECUTOR_AUTO:
+            return self.executor_mode
+        return EXECUTOR_THREAD if gil_disabled() else EXECUTOR_PROCESS
+
+    def get_dispatch_size(self, workers=None):
+        # کوچکترین دسته‌ای که run_chunks آن را موازی اجرا می‌کند؛ با یک کارگر جمع کردن لازم نیست
+        workers = workers or self.get_worker_count()
+        if workers < 2:
+            return 0
+        min_items = THREAD_MIN_ITEMS if self.get_executor_mode() == EXECUTOR_THREAD else PARALLEL_MIN_ITEMS
+        return max(min_items, workers * PARALLEL_CHUNK)
+
+    def check_prime_count(self, count):
+        if not isinstance(count, int):
+            raise TypeError("تعداد عامل‌های اول باید عدد صحیح باشد")
+        if count < 2:
+            raise ValueError("تعداد عامل‌های اول باید حداقل 2 باشد")
+
+    def check_table_size(self, table, count):
+        if table is not None and len(table) < count:
+            raise ValueError(f"این بازه فقط {len(table)} عدد اول دارد؛ حداقل {count} عدد لازم است")
+
+    def get_prime_spec(self, parallel=None):
+        if self.key_bits:
+            if parallel is None:
+                parallel = self.key_bits >= PARALLEL_MIN_BITS and self.get_worker_count() > 1
+            workers = self.get_worker_count() if parallel else 1
+            return ("bits", self.key_bits, self.prime_count, workers)
+        return ("range", self.start_number, self.end_number, self.prime_count)
+
+    def generate_prime_numbers(self, parallel=None):
+        spec = self.get_prime_spec(parallel)
+        primes = self.key_pool.take(spec) if self.key_pool is not None else None
+        if primes is None:
+            primes = draw_primes(spec)
+
+        self.primes = list(primes)
+        self.p, self.q = primes[0], primes[1]
+
+    def get_primes(self):
+        if self.primes:
+            return list(self.primes)
+        if self.p and self.q:
+            return [self.p, self.q]
+        return []
+
+    def get_prime_factors(self):
+        return [(factor_name(i), prime) for i, prime in enumerate(self.get_primes())]
+
+    def set_prime_factors(self, factors):
+        self.primes = [int(f) for f in factors if f]
+        if len(self.primes) >= 2:
+            self.p, self.q = self.primes[0], self.primes[1]
+        else:
+            self.p = self.q = None
+        self.calculate_crt_values()
 
     def calculate_keys(self):
-        phi_n = (self.p - 1) * (self.q - 1)
+        primes = self.get_primes()
+
+        phi_n = 1
+        n = 1
+        for prime in primes:
+            phi_n *= prime - 1
+            n *= prime
 
         if phi_n > 65537 and math.gcd(65537, phi_n) == 1:
             e = 65537
@@ -42,36 +1212,642 @@ class RSA:
             while e < phi_n and math.gcd(e, phi_n) != 1:
                 e += 2  
 
-        n = self.p * self.q
         d = pow(e, -1, phi_n)  
         
         self.phi_n = phi_n
         self.e = e
         self.n = n
         self.d = d
+        self.calculate_crt_values()
+
+    def calculate_crt_values(self):
+        primes = self.get_primes()
+        self.dp = self.dq = self.q_inv = None
+        self.crt_extra = []
+
+        if len(primes) < 2 or not self.d or not self.n:
+            return
+        if len(set(primes)) != len(primes) or math.prod(primes) != self.n:
+            return
+
+        self.dp = self.d % (self.p - 1)
+        self.dq = self.d % (self.q - 1)
+        self.q_inv = pow(self.q, -1, self.p)
+
+        # ضرایب Garner برای عامل‌های سوم به بعد: (r_i, d_i, t_i)
+        product = self.p * self.q
+        for prime in primes[2:]:
+            self.crt_extra.append((prime, self.d % (prime - 1), pow(product, -1, prime)))
+            product *= prime
+
+    def has_crt_values(self):
+        return self.dp is not None and self.dq is not None and self.q_inv is not None
 
     def generate_keys(self):
         self.generate_prime_numbers()
         self.calculate_keys()
         return (self.n, self.e), (self.n, self.d)  
 
-    def encrypt_message(self, message):
+    def generate_keys_parallel(self, workers=None):
+        if workers is not None:
+            self.set_workers(workers)
+        self.generate_prime_numbers(parallel=True)
+        self.calculate_keys()
+        return (self.n, self.e), (self.n, self.d)
+
+    def encrypt_message(self, message, mode=MODE_CHAR, workers=None, progress=None, recipients=None,
+                        compression=COMPRESS_NONE):
         if self.n is None or self.e is None:
             raise RuntimeError("کلیدها هنوز تولید نشده‌اند. ابتدا generate_keys() را فراخوانی کنید")
         
-        encrypted_numbers = []
-        for char in message:
-            encrypted_numbers.append(pow(ord(char), self.e, self.n))
-        return encrypted_numbers
+        if mode == MODE_CHAR:
+            if compression != COMPRESS_NONE:
+                raise ValueError("فشرده‌سازی در حالت کاراکتری پشتیبانی نمی‌شود")
+            return self.encrypt_chars(message, workers, progress)
 
-    def decrypt_message(self, encrypted_numbers):
+        data = compress_data(message.encode("utf-8"), compression)
+        if mode == MODE_BLOCK:
+            tokens = [BLOCK_TAG] + self.encrypt_bytes(data, workers, progress)
+        elif mode == MODE_HYBRID:
+            tokens = self.encrypt_hybrid(data, progress)
+        elif mode == MODE_MULTI:
+            tokens = self.encrypt_multi(data, recipients or [], progress)
+        else:
+            raise ValueError(f"حالت رمزنگاری نامعتبر است: {mode}")
+
+        tokens[0] += compression
+        return tokens
+
+    def decrypt_message(self, encrypted_numbers, workers=None, progress=None):
         if self.n is None or self.d is None:
             raise RuntimeError("کلیدها هنوز تولید نشده‌اند. ابتدا generate_keys() را فراخوانی کنید")
         
-        decrypted_chars = []
-        for number in encrypted_numbers:
-            decrypted_chars.append(chr(pow(int(number), self.d, self.n)))
-        return "".join(decrypted_chars)
+        encrypted_numbers = list(encrypted_numbers)
+        tag = encrypted_numbers[0] if encrypted_numbers and isinstance(encrypted_numbers[0], str) else ""
+        kind, compression = tag[:1], tag[1:]
+
+        if kind == BLOCK_TAG:
+            data = self.decrypt_bytes(encrypted_numbers[1:], workers, progress)
+        elif kind == HYBRID_TAG:
+            data = self.decrypt_hybrid(encrypted_numbers, progress)
+        elif kind == MULTI_TAG:
+            data = self.decrypt_multi(encrypted_numbers, progress)
+        else:
+            return "".join(self.decrypt_chars(encrypted_numbers, workers, progress))
+
+        return decompress_data(data, compression).decode("utf-8")
+
+    def encrypt_stream(self, chunks, output, mode=MODE_CHAR, compression=COMPRESS_NONE, workers=None,
+                       progress=None, recipients=None, total=None):
+        # chunks متن را تکه‌تکه می‌دهد و توکن‌ها همان‌جا در output نوشته می‌شوند
+        if self.n is None or self.e is None:
+            raise RuntimeError("کلیدها هنوز تولید نشده‌اند. ابتدا generate_keys() را فراخوانی کنید")
+        if mode == MODE_CHAR and compression != COMPRESS_NONE:
+            raise ValueError("فشرده‌سازی در حالت کاراکتری پشتیبانی نمی‌شود")
+        if mode not in (MODE_CHAR, MODE_BLOCK, MODE_HYBRID, MODE_MULTI):
+            raise ValueError(f"حالت رمزنگاری نامعتبر است: {mode}")
+
+        written = [False]
+        def write_tokens(tokens):
+            if not tokens:
+                return
+            if written[0]:
+                output.write(",")
+            output.write(",".join(map(str, tokens)))
+            written[0] = True
+
+        consumed = 0
+        def encoded_chunks():
+            nonlocal consumed
+            for chunk in chunks:
+                data = chunk.encode("utf-8")
+                consumed += len(data)
+                if progress and total:
+                    progress(min(consumed / total, 1.0))
+                yield chunk, data
+
+        if mode == MODE_CHAR:
+            for chunk, _ in encoded_chunks():
+                write_tokens(self.encrypt_chars(chunk, workers))
+            return
+
+        if mode in (MODE_HYBRID, MODE_MULTI):
+            # بار متقارن یک توکن مهروموم‌شده است؛ این دو حالت فقط از جعبه‌ی متنی عبور نمی‌کنند
+            self.check_session_key_size()
+            data = compress_data(b"".join(data for _, data in encoded_chunks()), compression)
+            if mode == MODE_HYBRID:
+                tokens = self.encrypt_hybrid(data)
+            else:
+                tokens = self.encrypt_multi(data, recipients or [])
+            tokens[0] += compression
+            write_tokens(tokens)
+            return
+
+        # بلوک‌های کامل بدون لایه‌گذاری رمز می‌شوند و فقط دنباله‌ی آخر لایه‌گذاری می‌شود
+        size = self.get_block_size()
+        compressor = make_compressor(compression)
+        pending = b""
+        write_tokens([BLOCK_TAG + compression])
+        for _, data in encoded_chunks():
+            pending += compressor.compress(data) if compressor else data
+            cut = len(pending) - len(pending) % size
+            blocks = [int.from_bytes(pending[i:i + size], "big") for i in range(0, cut, size)]
+            write_tokens(self.run_chunks("encrypt", blocks, workers))
+            pending = pending[cut:]
+
+        if compressor:
+            pending += compressor.flush()
+        write_tokens(self.encrypt_bytes(pending, workers))
+
+    def armor_message(self, tokens):
+        return armor_tokens(tokens, self.n)
+
+    def decrypt_armored(self, text, workers=None, progress=None):
+        fingerprint, tokens = dearmor(text)
+        if fingerprint is not None and fingerprint != key_fingerprint(self.n):
+            raise ValueError("این پیام برای کلید انتخاب‌شده رمز نشده است")
+        return self.decrypt_message(tokens, workers, progress)
+
+    def decrypt_range(self, path, start, end):
+        # نویسه‌های [start, end) یک فایل رمز حالت کاراکتری، بدون خواندن بقیه‌ی فایل
+        if self.n is None or self.d is None:
+            raise RuntimeError("کلیدها هنوز تولید نشده‌اند. ابتدا generate_keys() را فراخوانی کنید")
+
+        with open(path, "rb") as file:
+            header = file.read(len(ARMOR_BEGIN) + 16)
+        if is_container(header):
+            fingerprint, tokens = read_container_range(path, start, end)
+            if fingerprint != key_fingerprint(self.n):
+                raise ValueError("این پیام برای کلید انتخاب‌شده رمز نشده است")
+        elif is_armored(header.decode("ascii", "replace")):
+            raise ValueError("متن زره‌پوش فشرده است و دسترسی بخشی ندارد")
+        else:
+            tokens = read_token_range(path, start, end)
+        return "".join(self.decrypt_chars(tokens))
+
+    def decrypt_container(self, data, workers=None, progress=None):
+        fingerprint, tokens = read_container(data)
+        if fingerprint != key_fingerprint(self.n):
+            raise ValueError("این پیام برای کلید انتخاب‌شده رمز نشده است")
+        return self.decrypt_message(tokens, workers, progress)
+
+    def decrypt_stream(self, chunks, output, workers=None, progress=None, total=None,
+                       buffer_size=STREAM_CHUNK):
+        # متن رمز تکه‌تکه خوانده و رمزگشایی می‌شود و متن اصلی مستقیما در output نوشته می‌شود
+        if self.n is None or self.d is None:
+            raise RuntimeError("کلیدها هنوز تولید نشده‌اند. ابتدا generate_keys() را فراخوانی کنید")
+
+        consumed = 0
+        def counted_chunks():
+            nonlocal consumed
+            for chunk in chunks:
+                consumed += len(chunk)
+                if progress and total:
+                    progress(min(consumed / total, 1.0))
+                yield chunk
+
+        self.decrypt_batches(iter_token_batches(counted_chunks()), output, workers, buffer_size)
+
+    def decrypt_file(self, path, output, workers=None, progress=None, buffer_size=STREAM_CHUNK):
+        # فایل با mmap باز می‌شود؛ حافظه‌ی مقیم را حافظه‌ی نهان صفحات سیستم‌عامل مدیریت می‌کند
+        if self.n is None or self.d is None:
+            raise RuntimeError("کلیدها هنوز تولید نشده‌اند. ابتدا generate_keys() را فراخوانی کنید")
+
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                raise ValueError("فایل پیام خالی است")
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                self.decrypt_mapped(mapped, output, workers, progress, buffer_size)
+
+    def decrypt_mapped(self, mapped, output, workers=None, progress=None, buffer_size=STREAM_CHUNK):
+        if is_container(mapped[:len(CONTAINER_MAGIC)]):
+            with memoryview(mapped) as view:
+                fingerprint, tag, width, bodies = check_container(view)
+                # برش‌ها باید پیش از بستن mmap آزاد شوند، حتی اگر رمزگشایی خطا بدهد
+                try:
+                    if fingerprint != key_fingerprint(self.n):
+                        raise ValueError("این پیام برای کلید انتخاب‌شده رمز نشده است")
+                    batches = iter_container_batches(tag, width, bodies, progress)
+                    self.decrypt_batches(batches, output, workers, buffer_size)
+                    batches.close()
+                finally:
+                    release_views(bodies)
+            return
+
+        if mapped[:2] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE):
+            # متن UTF-16 را نمی‌توان بایت‌به‌بایت توکن کرد؛ رمزگشایی جریانی معمولی استفاده می‌شود
+            text = codecs.iterdecode(iter(lambda: mapped.read(buffer_size), b""), "utf-16")
+            self.decrypt_stream(text, output, workers, progress, len(mapped), buffer_size)
+            return
+
+        start = len(codecs.BOM_UTF8) if mapped[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8 else 0
+        if is_armored(mapped[start:start + len(ARMOR_BEGIN) + 16].decode("ascii", "replace")):
+            output.write(self.decrypt_armored(mapped[start:].decode("ascii"), workers))
+            return
+
+        self.decrypt_batches(iter_mapped_token_batches(mapped, start, buffer_size, progress), output, workers, buffer_size)
+
+    def decrypt_batches(self, batches, output, workers=None, buffer_size=STREAM_CHUNK):
+        # همه‌ی دسته‌های یک فایل از یک استخر کارگر استفاده می‌کنند و کلید فقط یک بار فرستاده می‌شود
+        with self.shared_pool():
+            self.write_decrypted_batches(batches, output, workers, buffer_size)
+
+    def write_decrypted_batches(self, batches, output, workers=None, buffer_size=STREAM_CHUNK):
+        first = next(batches, [])
+        tag = first[0] if first and isinstance(first[0], str) else ""
+        kind, compression = tag[:1], tag[1:]
+
+        if kind in (HYBRID_TAG, MULTI_TAG):
+            # بار متقارن یک توکن مهروموم‌شده است و فقط یکجا قابل بررسی است
+            output.write(self.decrypt_message(first + [token for batch in batches for token in batch], workers))
+            return
+
+        # بدون جمع کردن دسته‌ها هیچ فراخوانی run_chunks به حداقل کار موازی نمی‌رسد
+        dispatch = self.get_dispatch_size(workers)
+        if dispatch:
+            batches = regroup_batches(batches, dispatch)
+
+        if kind != BLOCK_TAG:
+            for batch in chain([first], batches):
+                output.write("".join(self.decrypt_chars(batch, workers)))
+            return
+
+        size = self.get_block_size()
+        decompressor = make_decompressor(compression)
+        decoder = codecs.getincrementaldecoder("utf-8")()
+
+        def emit(data, final=False):
+            if decompressor:
+                for part in iter_decompressed(decompressor, data, buffer_size):
+                    output.write(decoder.decode(part))
+                if final and not decompressor.eof:
+                    raise ValueError("داده‌ی فشرده ناقص است")
+            else:
+                output.write(decoder.decode(data))
+            if final:
+                output.write(decoder.decode(b"", True))
+
+        # بلوک آخر لایه‌گذاری دارد، پس همیشه یک بلوک تا پایان نگه داشته می‌شود
+        held = None
+        for batch in chain([first[1:]], batches):
+            if not batch:
+                continue
+            values = self.run_chunks("decrypt", batch, workers)
+            if held is not None:
+                values.insert(0, held)
+            held = values.pop()
+            emit(b"".join(int(value).to_bytes(size, "big") for value in values))
+
+        if held is None:
+            raise ValueError("پیام بلوکی هیچ بلوکی ندارد")
+        emit(self.unpack_blocks([held]), final=True)
+
+    def check_session_key_size(self):
+        # کلید جلسه باید با لایه‌گذاری در یک بلوک جا شود؛ بلوک‌های چندبایتی بدون لایه با کلید عمومی قابل جستجو هستند
+        if (self.n.bit_length() + 7) // 8 < SESSION_KEY_SIZE + WRAP_PADDING_MIN:
+            raise ValueError(
+                f"برای حالت ترکیبی کلید حداقل {8 * (SESSION_KEY_SIZE + WRAP_PADDING_MIN)} بیتی لازم است"
+            )
+
+    def wrap_session_key(self, session_key):
+        self.check_session_key_size()
+        size = (self.n.bit_length() + 7) // 8
+        filler = bytearray()
+        while len(filler) < size - len(session_key) - 3:
+            filler += secrets.token_bytes(size).replace(b"\x00", b"")
+        padded = b"\x00\x02" + bytes(filler[:size - len(session_key) - 3]) + b"\x00" + session_key
+        return [self.encrypt_number(int.from_bytes(padded, "big"))]
+
+    def unwrap_session_key(self, wrapped_key):
+        self.check_session_key_size()
+        if len(wrapped_key) != 1:
+            raise ValueError("کلید جلسه‌ی رمزشده نامعتبر است")
+        size = (self.n.bit_length() + 7) // 8
+        padded = self.decrypt_number(wrapped_key[0]).to_bytes(size, "big")
+        separator = padded.find(b"\x00", 2)
+        if padded[:2] != b"\x00\x02" or separator < 10 or len(padded) - separator - 1 != SESSION_KEY_SIZE:
+            raise ValueError("کلید جلسه‌ی رمزشده نامعتبر است")
+        return padded[separator + 1:]
+
+    def encrypt_hybrid(self, data, progress=None):
+        # فقط کلید جلسه با RSA رمز می‌شود؛ متن با یک رمز متقارن احراز اصالت‌شده
+        session_key = secrets.token_bytes(SESSION_KEY_SIZE)
+        wrapped_key = self.wrap_session_key(session_key)
+        algo, blob = symmetric_encrypt(session_key, data)
+        if progress:
+            progress(1.0)
+        return [HYBRID_TAG, algo, len(wrapped_key)] + wrapped_key + [encode_payload(blob)]
+
+    def decrypt_hybrid(self, tokens, progress=None):
+        algo, count = tokens[1], int(tokens[2])
+        wrapped_key = tokens[3:3 + count]
+        payload = tokens[3 + count:]
+        if len(wrapped_key) != count or len(payload) != 1:
+            raise ValueError("ساختار پیام ترکیبی نامعتبر است")
+
+        session_key = self.unwrap_session_key(wrapped_key)
+        data = symmetric_decrypt(algo, session_key, decode_payload(payload[0]))
+        if progress:
+            progress(1.0)
+        return data
+
+    def encrypt_multi(self, data, recipients, progress=None):
+        # متن یک بار رمز می‌شود و برای هر گیرنده فقط یک سرآیند کوچک اضافه می‌شود
+        public_keys = {}
+        for n, e in [self.get_public_key()] + list(recipients):
+            public_keys.setdefault(n, e)
+        recipient_keys = [RSA.from_public_key(n, e) for n, e in public_keys.items()]
+        # پیش از رمز کردن متن، اندازه‌ی کلید همه‌ی گیرنده‌ها بررسی می‌شود
+        for recipient in recipient_keys:
+            recipient.check_session_key_size()
+
+        session_key = secrets.token_bytes(SESSION_KEY_SIZE)
+        algo, blob = symmetric_encrypt(session_key, data)
+
+        tokens = [MULTI_TAG, algo, len(recipient_keys)]
+        for recipient in recipient_keys:
+            wrapped_key = recipient.wrap_session_key(session_key)
+            tokens += [key_fingerprint(recipient.n), len(wrapped_key)] + wrapped_key
+        if progress:
+            progress(1.0)
+        return tokens + [encode_payload(blob)]
+
+    def decrypt_multi(self, tokens, progress=None):
+        algo, count = tokens[1], int(tokens[2])
+        fingerprint = key_fingerprint(self.n)
+        wrapped_key = None
+        position = 3
+        for _ in range(count):
+            entry_fingerprint, size = tokens[position], int(tokens[position + 1])
+            if entry_fingerprint == fingerprint:
+                wrapped_key = tokens[position + 2:position + 2 + size]
+            position += 2 + size
+
+        if len(tokens) != position + 1:
+            raise ValueError("ساختار پیام چندگیرنده‌ای نامعتبر است")
+        if wrapped_key is None:
+            raise ValueError("این پیام برای کلید انتخاب‌شده رمز نشده است")
+
+        session_key = self.unwrap_session_key(wrapped_key)
+        data = symmetric_decrypt(algo, session_key, decode_payload(tokens[position]))
+        if progress:
+            progress(1.0)
+        return data
+
+    @classmethod
+    def from_public_key(cls, n, e):
+        rsa = cls()
+        rsa.n, rsa.e = n, e
+        return rsa
+
+    @classmethod
+    def from_key_values(cls, key_values):
+        # مقادیر فایل کلید: n لازم است؛ d و عامل‌های اول در فایل عمومی نیستند
+        rsa = cls()
+        rsa.n = key_values["n"]
+        rsa.d = key_values.get("d")
+        rsa.e = key_values.get("e", 65537)
+        rsa.set_prime_factors(factors_from_key_values(key_values))
+        return rsa
+
+    def get_key_state(self):
+        return {
+            "n": self.n,
+            "e": self.e,
+            "d": self.d,
+            "primes": self.get_primes(),
+            "backend": get_backend().name,
+        }
+
+    @classmethod
+    def from_key_state(cls, state):
+        rsa = cls()
+        rsa.n, rsa.e, rsa.d = state["n"], state["e"], state["d"]
+        rsa.set_prime_factors(state["primes"])
+        select_backend(state["backend"])
+        return rsa
+
+    def run_chunks(self, operation, items, workers=None, progress=None):
+        chunks = [items[i:i + PARALLEL_CHUNK] for i in range(0, len(items), PARALLEL_CHUNK)]
+        workers = workers or self.get_worker_count()
+        results = []
+
+        def report(index):
+            if progress:
+                progress((index + 1) / len(chunks))
+
+        executor_mode = self.get_executor_mode()
+        min_items = THREAD_MIN_ITEMS if executor_mode == EXECUTOR_THREAD else PARALLEL_MIN_ITEMS
+
+        if workers > 1 and len(items) >= min_items and not self.should_vectorize(items):
+            if executor_mode == EXECUTOR_THREAD:
+                task = self.encrypt_numbers if operation == "encrypt" else self.decrypt_numbers
+            else:
+                task = encrypt_chunk if operation == "encrypt" else decrypt_chunk
+
+            executor = self.get_executor(workers)
+            try:
+                for index, output in enumerate(executor.map(task, chunks)):
+                    results.extend(output)
+                    report(index)
+            finally:
+                if executor is not self.pool:
+                    executor.shutdown()
+        else:
+            method = self.encrypt_numbers if operation == "encrypt" else self.decrypt_numbers
+            for index, chunk in enumerate(chunks):
+                results.extend(method(chunk))
+                report(index)
+
+        if not chunks and progress:
+            progress(1.0)
+        return results
+
+    def should_vectorize(self, items):
+        # دسته‌ی پیمانه‌ی کوچک با NumPy در همین پردازه زودتر از رفت و برگشت pickle تمام می‌شود
+        return isinstance(items[0], int) and get_backend().can_vectorize(items, self.n)
+
+    def create_executor(self, workers):
+        if self.get_executor_mode() == EXECUTOR_THREAD:
+            from concurrent.futures import ThreadPoolExecutor
+
+            # انتخاب موتور پیش از شروع ریسه‌ها انجام شود تا کالیبراسیون همزمان تکرار نشود
+            get_backend()
+            return ThreadPoolExecutor(workers)
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        # کلید فقط یک بار و هنگام راه‌اندازی به هر کارگر فرستاده می‌شود
+        return ProcessPoolExecutor(workers, initializer=init_worker, initargs=(self.get_key_state(),))
+
+    def get_executor(self, workers):
+        if not self.pool_shared:
+            return self.create_executor(workers)
+        if self.pool is None:
+            self.pool = self.create_executor(workers)
+        return self.pool
+
+    @contextmanager
+    def shared_pool(self):
+        # درون این بازه استخر کارگر با اولین کار موازی ساخته و تا پایان نگه داشته می‌شود
+        if self.pool_shared:
+            yield
+            return
+
+        self.pool_shared = True
+        try:
+            yield
+        finally:
+            self.pool_shared = False
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
+
+    def check_codebooks(self):
+        # کدبوک‌ها فقط برای همان کلیدی معتبرند که با آن ساخته شده‌اند
+        key = (self.n, self.e, self.d)
+        if key != self.codebook_key:
+            self.encrypt_codebook.clear()
+            self.decrypt_codebook.clear()
+            self.codebook_key = key
+
+    def encrypt_chars(self, chars, workers=None, progress=None):
+        self.check_codebooks()
+        table = {}
+        missing = []
+        for code_point in {ord(char) for char in chars}:
+            number = self.encrypt_codebook.get(code_point)
+            if number is None:
+                missing.append(code_point)
+            else:
+                table[code_point] = number
+
+        for code_point, number in zip(missing, self.run_chunks("encrypt", missing, workers, progress)):
+            self.encrypt_codebook.put(code_point, number)
+            table[code_point] = number
+        return [table[ord(char)] for char in chars]
+
+    def decrypt_chars(self, numbers, workers=None, progress=None):
+        self.check_codebooks()
+        numbers = [int(number) for number in numbers]
+        table = {}
+        missing = []
+        for number in set(numbers):
+            char = self.decrypt_codebook.get(number)
+            if char is None:
+                missing.append(number)
+            else:
+                table[number] = char
+
+        for number, value in zip(missing, self.run_chunks("decrypt", missing, workers, progress)):
+            char = chr(value)
+            self.decrypt_codebook.put(number, char)
+            table[number] = char
+        return [table[number] for number in numbers]
+
+    def encrypt_numbers(self, values):
+        return get_backend().powmod_many(list(values), self.e, self.n)
+
+    def decrypt_numbers(self, numbers):
+        numbers = [int(number) for number in numbers]
+        backend = get_backend()
+        if backend.can_vectorize(numbers, self.n):
+            return backend.powmod_many(numbers, self.d, self.n)
+        return [self.decrypt_number(number) for number in numbers]
+
+    def get_block_size(self):
+        # بزرگترین تعداد بایت که عدد حاصل همیشه کوچکتر از n باشد
+        size = (self.n.bit_length() - 1) // 8
+        if size < 1:
+            raise ValueError("n برای حالت بلوکی خیلی کوچک است (حداقل 256)")
+        return size
+
+    def pack_blocks(self, data):
+        size = self.get_block_size()
+        # لایه‌گذاری 0x80 و سپس صفر تا طول داده دقیقا بازیابی شود
+        padded = bytes(data) + b"\x80" + b"\x00" * ((-len(data) - 1) % size)
+        return [int.from_bytes(padded[i:i + size], "big") for i in range(0, len(padded), size)]
+
+    def unpack_blocks(self, values):
+        size = self.get_block_size()
+        padded = b"".join(int(value).to_bytes(size, "big") for value in values)
+        data = padded.rstrip(b"\x00")
+        if not data.endswith(b"\x80"):
+            raise ValueError("لایه‌گذاری بلوک‌ها نامعتبر است")
+        return data[:-1]
+
+    def encrypt_bytes(self, data, workers=None, progress=None):
+        return self.run_chunks("encrypt", self.pack_blocks(data), workers, progress)
+
+    def decrypt_bytes(self, encrypted_numbers, workers=None, progress=None):
+        return self.unpack_blocks(self.run_chunks("decrypt", list(encrypted_numbers), workers, progress))
+
+    def encrypt_number(self, value):
+        return get_backend().powmod(value, self.e, self.n)
+
+    def decrypt_number(self, number):
+        number = int(number)
+        powmod = get_backend().powmod
+        if not self.has_crt_values():
+            return powmod(number, self.d, self.n)
+
+        # رمزگشایی با قضیه باقیمانده چینی: دو توان کوچک به جای یک توان بزرگ
+        m1 = powmod(number, self.dp, self.p)
+        m2 = powmod(number, self.dq, self.q)
+        h = (self.q_inv * (m1 - m2)) % self.p
+        m = m2 + h * self.q
+
+        product = self.p * self.q
+        for prime, exponent, coefficient in self.crt_extra:
+            m_i = powmod(number, exponent, prime)
+            h = ((m_i - m) * coefficient) % prime
+            m += product * h
+            product *= prime
+        return m
+
+    def check_signature_size(self):
+        # امضای چند ده بیتی با جستجوی چکیده برای سند دیگری هم ساخته می‌شود؛ امضای ضعیف صادر نمی‌شود
+        needed = len(SHA256_DIGEST_INFO) + hashlib.sha256().digest_size + WRAP_PADDING_MIN
+        if (self.n.bit_length() + 7) // 8 < needed:
+            raise ValueError(f"برای امضا کلید حداقل {8 * needed} بیتی لازم است")
+
+    def encode_digest(self, digest):
+        self.check_signature_size()
+        size = (self.n.bit_length() + 7) // 8
+        info = SHA256_DIGEST_INFO + digest
+        padded = b"\x00\x01" + b"\xff" * (size - len(info) - 3) + b"\x00" + info
+        return int.from_bytes(padded, "big")
+
+    def sign_digest(self, digest):
+        if self.n is None or self.d is None:
+            raise RuntimeError("کلیدها هنوز تولید نشده‌اند. ابتدا generate_keys() را فراخوانی کنید")
+
+        value = self.encode_digest(digest)
+        signature = self.decrypt_number(value)
+        # بررسی با توان عمومی ارزان است و خطای احتمالی مسیر CRT را پیش از انتشار امضا می‌گیرد
+        if self.e is not None and self.encrypt_number(signature) != value:
+            raise RuntimeError("امضای تولیدشده با کلید عمومی تایید نشد")
+        return signature
+
+    def verify_digest(self, digest, signature):
+        if self.n is None or self.e is None:
+            raise RuntimeError("کلید عمومی تنظیم نشده است")
+
+        if self.e < 3:
+            raise ValueError("توان عمومی کلید نامعتبر است")
+
+        signature = int(signature)
+        if not 0 <= signature < self.n:
+            return False
+        return self.encrypt_number(signature) == self.encode_digest(digest)
+
+    def sign_file(self, path, chunk_size=SIGN_CHUNK, progress=None):
+        # اندازه‌ی کلید پیش از خواندن کل فایل بررسی می‌شود
+        self.check_signature_size()
+        return self.sign_digest(hash_file(path, chunk_size, progress))
+
+    def verify_file(self, path, signature, chunk_size=SIGN_CHUNK, progress=None):
+        return self.verify_digest(hash_file(path, chunk_size, progress), signature)
 
     def get_public_key(self):
         if self.n is None or self.e is None:
@@ -86,6 +1862,14 @@ class RSA:
     def is_keys_generated(self):
         return all([self.n, self.e, self.d, self.p, self.q])
 
+    def export_public_key(self):
+        return f"n={self.n}\ne={self.e}"
+
+    def export_private_key(self):
+        key_lines = [f"n={self.n}", f"e={self.e}", f"d={self.d}"]
+        key_lines += [f"{name}={value}" for name, value in self.get_prime_factors()]
+        return "\n".join(key_lines)
+
     def get_key_info(self):
         if not self.is_keys_generated():
             return "کلیدها تولید نشده‌اند"
@@ -93,8 +1877,36 @@ class RSA:
         return {
             "p": self.p,
             "q": self.q,
+            "primes": self.get_primes(),
             "n": self.n,
             "e": self.e,
             "d": self.d,
             "phi_n": self.phi_n
-        }
\ No newline at end of file
+        }
+
+worker_rsa = None
+
+def init_worker(key_state):
+    global worker_rsa
+    worker_rsa = RSA.from_key_state(key_state)
+
+def encrypt_chunk(values):
+    return worker_rsa.encrypt_numbers(values)
+
+def decrypt_chunk(numbers):
+    return worker_rsa.decrypt_numbers(numbers)
+
+def provision_keys(config, count):
+    # config: (start, end, bits, prime_count)؛ هر فراخوانی یک دسته کلید در یک پردازه می‌سازد
+    start, end, bits, prime_count = config
+    rsa = RSA(start, end, prime_count)
+    if bits:
+        rsa.set_key_size(bits, prime_count)
+
+    states = []
+    for _ in range(count):
+        # جستجوی اول‌ها داخل همین پردازه انجام می‌شود؛ موازی‌سازی در سطح دسته‌هاست
+        rsa.generate_prime_numbers(parallel=False)
+        rsa.calculate_keys()
+        states.append(rsa.get_key_state())
+    return states
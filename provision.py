@@ -0,0 +1,86 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import setting
+from myrsa import RSA, KEY_SIZES, key_fingerprint, provision_keys
+
+BATCH_SIZE = 16
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate many RSA keypairs in parallel")
+    parser.add_argument('count', type=int, help='number of keypairs to generate')
+    parser.add_argument('--out', default='keys', help='output directory')
+    parser.add_argument('--bits', type=int, choices=KEY_SIZES, help='key size (default: number range)')
+    parser.add_argument('--start', type=int, default=1000, help='range start for range keys')
+    parser.add_argument('--end', type=int, default=10000, help='range end for range keys')
+    parser.add_argument('--primes', type=int, default=2, help='prime factors per key')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='worker processes')
+    parser.add_argument('--batch', type=int, default=BATCH_SIZE, help='keys per worker task')
+    return parser.parse_args()
+
+def split_batches(count, batch_size):
+    batches = [batch_size] * (count // batch_size)
+    if count % batch_size:
+        batches.append(count % batch_size)
+    return batches
+
+def write_key_files(out_dir, key_state):
+    rsa = RSA.from_key_state(key_state)
+    fingerprint = key_fingerprint(rsa.n)
+    private_path = os.path.join(out_dir, f"{fingerprint}_private_key.txt")
+
+    # در بازه‌های کوچک ممکن است یک کلید دوباره ساخته شود؛ فایل موجود بازنویسی نمی‌شود
+    if os.path.exists(private_path):
+        return False
+
+    setting.write_text_file(private_path, rsa.export_private_key())
+    setting.write_text_file(os.path.join(out_dir, f"{fingerprint}_public_key.txt"), rsa.export_public_key())
+    return True
+
+def main():
+    args = parse_args()
+    if args.count < 1 or args.batch < 1 or args.workers < 1:
+        raise SystemExit("count, batch and workers must be positive")
+
+    # قبل از شروع پردازه‌ها تنظیمات بررسی می‌شود تا خطا فقط یک بار گزارش شود
+    try:
+        check = RSA(args.start, args.end, args.primes)
+        if args.bits:
+            check.set_key_size(args.bits, args.primes)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    os.makedirs(args.out, exist_ok=True)
+    config = (args.start, args.end, args.bits, args.primes)
+
+    written = duplicates = 0
+    begin = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(provision_keys, config, size)
+            for size in split_batches(args.count, args.batch)
+        ]
+        for future in as_completed(futures):
+            for key_state in future.result():
+                if write_key_files(args.out, key_state):
+                    written += 1
+                else:
+                    duplicates += 1
+
+            elapsed = time.perf_counter() - begin
+            print(f"\r{written + duplicates}/{args.count} keys, {(written + duplicates) / elapsed:.1f} keys/s",
+                  end="", flush=True)
+
+    elapsed = time.perf_counter() - begin
+    print()
+    print(f"generated: {written + duplicates}")
+    print(f"written:   {written} ({duplicates} duplicate)")
+    print(f"workers:   {args.workers}")
+    print(f"elapsed:   {elapsed:.2f} s")
+    print(f"rate:      {(written + duplicates) / elapsed:.1f} keys/s")
+
+if __name__ == "__main__":
+    main()
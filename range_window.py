@@ -1,6 +1,7 @@
 import customtkinter as ctk
 import tkinter as tk
 from CTkMessagebox import CTkMessagebox
+from myrsa import KEY_SIZES
 
 class RangeWindow(ctk.CTkToplevel):
     MAX_END = 1_000_000
@@ -18,7 +19,7 @@ class RangeWindow(ctk.CTkToplevel):
         self.grab_set()
         self.resizable(False, False)
         
-        w, h = 360, 160
+        w, h = 360, 240
         x = parent.winfo_rootx() + (parent.winfo_width() - w) // 2
         y = parent.winfo_rooty() + (parent.winfo_height() - h) // 2
         self.geometry(f"{w}x{h}+{x}+{y}")
@@ -31,6 +32,10 @@ class RangeWindow(ctk.CTkToplevel):
         
         self.start_var = tk.StringVar(value=str(self.parent.rsa_start))
         self.end_var = tk.StringVar(value=str(self.parent.rsa_end))
+        self.prime_count_var = tk.StringVar(value=str(self.parent.rsa_prime_count))
+        self.key_size_var = tk.StringVar(
+            value=str(self.parent.rsa_key_bits or self.parent.translate("key_size_range"))
+        )
 
         self.create_input_fields(frame)
         
@@ -55,6 +60,30 @@ class RangeWindow(ctk.CTkToplevel):
         ).pack(side="left")
         ctk.CTkEntry(end_row, width=120, textvariable=self.end_var).pack(side="left", padx=8)
 
+        count_row = ctk.CTkFrame(parent, fg_color="transparent")
+        count_row.pack(fill="x", pady=6)
+        
+        ctk.CTkLabel(
+            count_row, 
+            text=f"{self.parent.translate('interval_primes')} ({self.parent.translate('interval_primes_hint')})"
+        ).pack(side="left")
+        ctk.CTkEntry(count_row, width=60, textvariable=self.prime_count_var).pack(side="left", padx=8)
+
+        size_row = ctk.CTkFrame(parent, fg_color="transparent")
+        size_row.pack(fill="x", pady=6)
+        
+        ctk.CTkLabel(size_row, text=self.parent.translate("key_size")).pack(side="left")
+        ctk.CTkOptionMenu(
+            size_row, 
+            width=120,
+            values=[self.parent.translate("key_size_range")] + [str(bits) for bits in KEY_SIZES],
+            variable=self.key_size_var
+        ).pack(side="left", padx=8)
+
+    def get_key_bits(self):
+        value = self.key_size_var.get()
+        return int(value) if value.isdigit() else None
+
     def create_buttons(self, parent):
         buttons_frame = ctk.CTkFrame(parent, fg_color="transparent")
         buttons_frame.pack(fill="x", pady=(10, 0))
@@ -77,36 +106,52 @@ class RangeWindow(ctk.CTkToplevel):
         try:
             start = int(self.start_var.get())
             end = int(self.end_var.get())
+            prime_count = int(self.prime_count_var.get())
         except ValueError:
             self.show_error("interval_err_int")
-            return None, None
+            return None, None, None
         
         if start < 2:
             self.show_error("interval_err_start")
-            return None, None
+            return None, None, None
         
         if end <= start + 5:
             self.show_error("interval_err_gap")
-            return None, None
+            return None, None, None
         
         if end > self.MAX_END:
             self.show_error("interval_err_max")
-            return None, None
+            return None, None, None
+        
+        if prime_count < 2:
+            self.show_error("interval_err_primes")
+            return None, None, None
         
-        return start, end
+        return start, end, prime_count
 
     def save_range(self):
         try:
             if not self.winfo_exists():
                 return
                 
-            start, end = self.validate_inputs()
-            if start is None or end is None:
+            start, end, prime_count = self.validate_inputs()
+            if start is None or end is None or prime_count is None:
+                return
+
+            key_bits = self.get_key_bits()
+            try:
+                if key_bits:
+                    self.parent.rsa.set_key_size(key_bits, prime_count)
+                else:
+                    self.parent.rsa.set_prime_range(start, end, prime_count)
+            except ValueError:
+                self.show_error("interval_err_key_size" if key_bits else "interval_err_few_primes")
                 return
 
             self.parent.rsa_start = start
             self.parent.rsa_end = end
-            self.parent.rsa.set_prime_range(start, end)
+            self.parent.rsa_prime_count = prime_count
+            self.parent.rsa_key_bits = key_bits
             
             self.show_success("interval_saved")
             self.safe_close()
@@ -3,7 +3,15 @@ import tkinter as tk
 from tkinter import filedialog
 from CTkMessagebox import CTkMessagebox
 import os
+import threading
+from itertools import chain
 import setting
+from myrsa import (
+    MODE_CHAR, MODE_BLOCK, MODE_HYBRID, MODE_MULTI,
+    COMPRESS_NONE, COMPRESS_ZLIB, COMPRESS_LZMA, STREAM_CHUNK, ALGO_AESGCM,
+    build_token_index, write_container, symmetric_algorithm,
+)
+from show_window import ProgressWindow
 
 class SendWindow(ctk.CTkToplevel):
     def __init__(self, parent):
@@ -24,7 +32,7 @@ class SendWindow(ctk.CTkToplevel):
         except:
             pass
             
-        w, h = 720, 520
+        w, h = 720, 560
         x = parent.winfo_rootx() + (parent.winfo_width() - w) // 2
         y = parent.winfo_rooty() + (parent.winfo_height() - h) // 2
         self.geometry(f"{w}x{h}+{x}+{y}")
@@ -38,6 +46,7 @@ class SendWindow(ctk.CTkToplevel):
         self.create_description()
         self.create_file_controls()
         self.create_text_area()
+        self.create_options_row()
         self.create_action_button()
 
     def create_description(self):
@@ -63,6 +72,14 @@ class SendWindow(ctk.CTkToplevel):
             command=self.read_file_content
         ).grid(row=0, column=1, padx=8)
         
+        self.direct_var = tk.BooleanVar(value=False)
+        
+        ctk.CTkCheckBox(
+            control_row, 
+            text=self.parent.translate("encrypt_direct"),
+            variable=self.direct_var
+        ).grid(row=0, column=3, sticky="e")
+        
         ctk.CTkLabel(
             control_row, 
             textvariable=self.selected_file_path, 
@@ -73,6 +90,65 @@ class SendWindow(ctk.CTkToplevel):
         self.text_area = ctk.CTkTextbox(self, height=320)
         self.text_area.grid(row=2, column=0, sticky="nsew", padx=12, pady=6)
 
+    def create_options_row(self):
+        options_row = ctk.CTkFrame(self, fg_color="transparent")
+        options_row.grid(row=3, column=0, sticky="ew", padx=12, pady=(6, 0))
+        
+        # بدون cryptography حالت ترکیبی از SHAKE/HMAC استفاده می‌کند و برچسب هم همین را نشان می‌دهد
+        hybrid_key = "mode_hybrid" if symmetric_algorithm() == ALGO_AESGCM else "mode_hybrid_fallback"
+        self.mode_labels = {
+            MODE_CHAR: self.parent.translate("mode_char"),
+            MODE_BLOCK: self.parent.translate("mode_block"),
+            MODE_HYBRID: self.parent.translate(hybrid_key),
+            MODE_MULTI: self.parent.translate("mode_multi"),
+        }
+        self.mode_var = tk.StringVar(value=self.mode_labels[MODE_CHAR])
+        
+        ctk.CTkLabel(options_row, text=self.parent.translate("enc_mode")).pack(side="left")
+        ctk.CTkOptionMenu(
+            options_row, 
+            values=list(self.mode_labels.values()),
+            variable=self.mode_var
+        ).pack(side="left", padx=8)
+        
+        self.compression_labels = {
+            COMPRESS_NONE: self.parent.translate("compress_none"),
+            COMPRESS_ZLIB: "zlib",
+            COMPRESS_LZMA: "lzma",
+        }
+        self.compression_var = tk.StringVar(value=self.compression_labels[COMPRESS_NONE])
+        
+        ctk.CTkLabel(options_row, text=self.parent.translate("compression")).pack(side="left", padx=(8, 0))
+        ctk.CTkOptionMenu(
+            options_row, 
+            width=90,
+            values=list(self.compression_labels.values()),
+            variable=self.compression_var
+        ).pack(side="left", padx=8)
+        
+        self.armor_var = tk.BooleanVar(value=False)
+        
+        ctk.CTkCheckBox(
+            options_row, 
+            text=self.parent.translate("armor"),
+            variable=self.armor_var
+        ).pack(side="left", padx=8)
+        
+        self.recipient_keys = []
+        self.recipients_label = tk.StringVar(value="")
+        
+        ctk.CTkButton(
+            options_row, 
+            text=self.parent.translate("pick_recipients"),
+            command=self.select_recipient_keys
+        ).pack(side="left", padx=8)
+        
+        ctk.CTkLabel(
+            options_row, 
+            textvariable=self.recipients_label, 
+            text_color=("gray20", "#bbb")
+        ).pack(side="left")
+
     def create_action_button(self):
         ctk.CTkButton(
             self, 
@@ -80,7 +156,21 @@ class SendWindow(ctk.CTkToplevel):
             fg_color=setting.primary_bg, 
             hover_color=setting.primary_abg,
             command=self.encrypt_and_save_message
-        ).grid(row=3, column=0, padx=12, pady=10, sticky="e")
+        ).grid(row=4, column=0, padx=12, pady=10, sticky="e")
+
+    def get_selected_mode(self):
+        selected = self.mode_var.get()
+        for mode, label in self.mode_labels.items():
+            if label == selected:
+                return mode
+        return MODE_CHAR
+
+    def get_selected_compression(self):
+        selected = self.compression_var.get()
+        for compression, label in self.compression_labels.items():
+            if label == selected:
+                return compression
+        return COMPRESS_NONE
 
     def select_file(self):
         try:
@@ -104,6 +194,35 @@ class SendWindow(ctk.CTkToplevel):
         except Exception as e:
             print(f"خطا در select_file: {e}")
 
+    def select_recipient_keys(self):
+        try:
+            file_paths = filedialog.askopenfilenames(
+                title=self.parent.translate("pick_recipients"),
+                filetypes=[
+                    ("Text / PDF / DOCX", "*.txt *.pdf *.docx *.dox"), 
+                    ("All files", "*.*")
+                ]
+            )
+            
+            for file_path in file_paths:
+                key_values = setting.parse_key_values(setting.read_text_any(file_path))
+                if "n" not in key_values or "e" not in key_values:
+                    self.show_error("need_public")
+                    continue
+                
+                public_key = (key_values["n"], key_values["e"])
+                if public_key not in self.recipient_keys:
+                    self.recipient_keys.append(public_key)
+            
+            if self.recipient_keys:
+                self.recipients_label.set(
+                    self.parent.translate("recipients_count").replace("{count}", str(len(self.recipient_keys)))
+                )
+                self.mode_var.set(self.mode_labels[MODE_MULTI])
+            
+        except Exception as e:
+            self.show_error(str(e))
+
     def read_file_content(self):
         try:
             file_path = self.selected_file_path.get().strip()
@@ -132,34 +251,111 @@ class SendWindow(ctk.CTkToplevel):
             if not self.winfo_exists():
                 return
                 
-            message = self.get_message_content()
-            if not message:
-                self.show_notice("empty_text")
-                return
+            source_path = None
+            message = None
+            if self.direct_var.get():
+                # فایل مستقیم و تکه‌تکه رمز می‌شود و هرگز در جعبه‌ی متن بارگذاری نمی‌شود
+                source_path = self.selected_file_path.get().strip()
+                if not source_path:
+                    self.show_notice("pick_first")
+                    return
+            else:
+                message = self.get_message_content()
+                if not message:
+                    self.show_notice("empty_text")
+                    return
 
             output_path = self.get_save_location()
             if not output_path:
                 return
                 
-            if not setting.is_supported_file(output_path):
+            is_container = setting.get_file_extension(output_path) == setting.CONTAINER_EXT
+            if not is_container and not setting.is_supported_file(output_path):
                 self.show_error("only_formats")
                 return
+            
+            if source_path and setting.get_file_extension(output_path) != ".txt":
+                self.show_error("direct_txt_only")
+                return
+            
+            # متغیرهای Tk فقط در همین رشته خوانده می‌شوند، نه در رشته‌ی رمزگذاری
+            armor = self.armor_var.get()
+            if source_path and armor:
+                self.show_error("armor_no_direct")
+                return
+
+            mode = self.get_selected_mode()
+            compression = self.get_selected_compression()
+            if compression and mode == MODE_CHAR:
+                # فشرده‌سازی فقط روی بایت‌ها معنا دارد؛ حالت کاراکتری به بلوکی تبدیل می‌شود
+                mode = MODE_BLOCK
+            
+            if is_container and mode not in (MODE_CHAR, MODE_BLOCK):
+                self.show_error("container_modes")
+                return
+
+            self.start_encryption_process(message, output_path, mode, compression, source_path, armor)
+            
+        except Exception as e:
+            self.show_error(str(e))
 
-            rsa_instance = self.parent.rsa
-            if not rsa_instance.is_keys_generated():
-                rsa_instance.generate_keys()
+    def start_encryption_process(self, message, output_path, mode, compression=COMPRESS_NONE, source_path=None,
+                                 armor=False):
+        progress_window = ProgressWindow(
+            self, 
+            self.parent.translate("info"), 
+            self.parent.translate("encrypting")
+        )
+        
+        self.grab_release()
+        
+        def encryption_thread():
+            try:
+                rsa_instance = self.parent.rsa
+                if not rsa_instance.is_keys_generated():
+                    rsa_instance.generate_keys()
 
-            encrypted_numbers = self.encrypt_message(message, rsa_instance)
+                if source_path:
+                    self.encrypt_file_directly(
+                        source_path, output_path, rsa_instance, mode, progress_window, compression
+                    )
+                    if mode == MODE_CHAR:
+                        build_token_index(output_path)
+                else:
+                    encrypted_numbers = self.encrypt_message(message, rsa_instance, mode, progress_window, compression)
+                    
+                    self.save_encrypted_file(output_path, encrypted_numbers, armor)
+                
+                self.after(0, lambda: self.complete_encryption(output_path, progress_window, None))
+                
+            except Exception as e:
+                error = str(e)
+                self.after(0, lambda: self.complete_encryption(output_path, progress_window, error))
+
+        threading.Thread(target=encryption_thread, daemon=True).start()
+
+    def complete_encryption(self, output_path, progress_window, error):
+        try:
+            if progress_window and progress_window.winfo_exists():
+                progress_window.safe_close()
+            
+            if not self.winfo_exists():
+                return
+            
+            self.grab_set()
             
-            self.save_encrypted_file(output_path, encrypted_numbers)
+            if error:
+                self.show_error(error)
+                return
             
-            self.save_private_key_file(output_path, rsa_instance)
+            self.save_private_key_file(output_path, self.parent.rsa)
+            self.save_public_key_file(output_path, self.parent.rsa)
 
             self.show_success("enc_done")
             self.safe_close()
             
         except Exception as e:
-            self.show_error(str(e))
+            print(f"خطا در complete_encryption: {e}")
 
     def get_save_location(self):
         return filedialog.asksaveasfilename(
@@ -167,27 +363,83 @@ class SendWindow(ctk.CTkToplevel):
             defaultextension=".txt",
             filetypes=[
                 ("Text", "*.txt"), 
+                ("RSA container", f"*{setting.CONTAINER_EXT}"), 
                 ("PDF", "*.pdf"), 
                 ("Word (docx)", "*.docx"), 
                 ("Word (dox)", "*.dox")
             ]
         )
 
-    def encrypt_message(self, message, rsa_instance):
-        encrypted_numbers = []
-        for character in message:
-            encrypted_numbers.append(pow(ord(character), rsa_instance.e, rsa_instance.n))
-        return encrypted_numbers
+    def encrypt_message(self, message, rsa_instance, mode=MODE_CHAR, progress_window=None, compression=COMPRESS_NONE):
+        report = progress_window.report_progress if progress_window else None
+        
+        return rsa_instance.encrypt_message(
+            message, mode, progress=report, recipients=self.recipient_keys, compression=compression
+        )
+
+    def encrypt_file_directly(self, source_path, output_path, rsa_instance, mode=MODE_CHAR,
+                              progress_window=None, compression=COMPRESS_NONE):
+        report = progress_window.report_progress if progress_window else None
+        chunks = setting.iter_text_chunks(source_path, STREAM_CHUNK)
+        first_chunk = next(chunks, "")
+        if not first_chunk:
+            # پیام خالی حالت کاراکتری فایل رمز خالی می‌دهد که قابل رمزگشایی نیست؛ مثل جعبه‌ی متن پذیرفته نمی‌شود
+            raise ValueError("empty_text")
+        
+        try:
+            with open(output_path, "w", encoding="utf-8") as output:
+                rsa_instance.encrypt_stream(
+                    chain([first_chunk], chunks), output, mode, compression,
+                    progress=report, recipients=self.recipient_keys, total=os.path.getsize(source_path)
+                )
+        except BaseException:
+            # متن رمز نیمه‌کاره قابل رمزگشایی نیست و نباید جای خروجی درست را بگیرد
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            raise
 
-    def save_encrypted_file(self, file_path, encrypted_numbers):
-        encrypted_text = ",".join(map(str, encrypted_numbers))
+    def save_encrypted_file(self, file_path, encrypted_numbers, armor=False):
+        if setting.get_file_extension(file_path) == setting.CONTAINER_EXT:
+            with open(file_path, "wb") as output:
+                write_container(output, encrypted_numbers, self.parent.rsa.n)
+            return
+        
+        if armor:
+            encrypted_text = self.parent.rsa.armor_message(encrypted_numbers)
+        else:
+            encrypted_text = ",".join(map(str, encrypted_numbers))
         setting.write_text_as(file_path, encrypted_text)
+        
+        # فهرست کناری برای پیش‌نمایش بخشی فقط برای فایل متنی حالت کاراکتری معنا دارد
+        is_char_mode = encrypted_numbers and not isinstance(encrypted_numbers[0], str)
+        if is_char_mode and not armor and setting.get_file_extension(file_path) == ".txt":
+            build_token_index(file_path)
+
+    def split_output_path(self, original_path):
+        base_name, extension = os.path.splitext(original_path)
+        # فایل‌های کلید همیشه متنی هستند، حتی وقتی پیام در قالب دودویی ذخیره شده باشد
+        if extension.lower() == setting.CONTAINER_EXT:
+            extension = ".txt"
+        return base_name, extension
 
     def save_private_key_file(self, original_path, rsa_instance):
         try:
-            base_name, extension = os.path.splitext(original_path)
+            base_name, extension = self.split_output_path(original_path)
             key_file_path = f"{base_name}_private_key{extension}"
-            key_content = f"n={rsa_instance.n}\nd={rsa_instance.d}"
+            key_content = rsa_instance.export_private_key()
+            
+            setting.write_text_as(key_file_path, key_content)
+            
+        except Exception as e:
+            self.show_warning(
+                self.parent.translate("key_save_fail").replace("{err}", str(e))
+            )
+
+    def save_public_key_file(self, original_path, rsa_instance):
+        try:
+            base_name, extension = self.split_output_path(original_path)
+            key_file_path = f"{base_name}_public_key{extension}"
+            key_content = rsa_instance.export_public_key()
             
             setting.write_text_as(key_file_path, key_content)
             
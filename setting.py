@@ -1,9 +1,11 @@
 import argparse
+import codecs
 import re
 import os
 import sys
 
 ALLOWED_EXTS = {".txt", ".pdf", ".docx", ".dox"}
+CONTAINER_EXT = ".rsac"
 
 def get_file_extension(file_path):
     return os.path.splitext(file_path)[1].lower()
@@ -11,10 +13,10 @@ def get_file_extension(file_path):
 def is_supported_file(file_path):
     return get_file_extension(file_path) in ALLOWED_EXTS
 
+TEXT_ENCODINGS = ["utf-8", "utf-16", "cp1256", "cp1252"]
+
 def read_text_file(file_path):
-    encodings = ["utf-8", "utf-16", "cp1256", "cp1252"]
-    
-    for encoding in encodings:
+    for encoding in TEXT_ENCODINGS:
         try:
             with open(file_path, "r", encoding=encoding) as file:
                 return file.read()
@@ -58,6 +60,54 @@ def read_text_any(file_path):
     else:
         raise ValueError("نوع فایل پشتیبانی نمی‌شود")
 
+def detect_text_encoding(file_path, chunk_size=1 << 16):
+    for encoding in TEXT_ENCODINGS:
+        # کل فایل از رمزگشای افزایشی می‌گذرد؛ بایت نامعتبر در انتهای فایل هم همین‌جا دیده می‌شود
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            with open(file_path, "rb") as file:
+                for block in iter(lambda: file.read(chunk_size), b""):
+                    decoder.decode(block)
+            decoder.decode(b"", final=True)
+        except UnicodeError:
+            continue
+        return encoding
+
+    raise IOError("نمی‌توان فایل متنی را با انکودینگ‌های متداول خواند")
+
+def read_text_chunks(file_path, encoding, chunk_size):
+    with open(file_path, "r", encoding=encoding) as file:
+        for chunk in iter(lambda: file.read(chunk_size), ""):
+            yield chunk
+
+def iter_text_chunks(file_path, chunk_size=1 << 16):
+    # انکودینگ پیش از برگرداندن تکه‌ها قطعی می‌شود تا خطا قبل از ساختن فایل خروجی رخ دهد
+    if get_file_extension(file_path) != ".txt":
+        # متن pdf/docx فقط یکجا استخراج می‌شود
+        text = read_text_any(file_path)
+        return (text[offset:offset + chunk_size] for offset in range(0, len(text), chunk_size))
+
+    return read_text_chunks(file_path, detect_text_encoding(file_path, chunk_size), chunk_size)
+
+def parse_key_values(key_file_content):
+    key_values = {}
+    
+    for line in key_file_content.replace("\r", "").split("\n"):
+        if "=" in line:
+            key, value = line.split("=", 1)
+            key = key.strip().lower()
+            value = value.strip()
+            
+            try:
+                if value.isdigit():
+                    key_values[key] = int(value)
+                else:
+                    key_values[key] = int(value.replace(",", ""))
+            except:
+                pass
+    
+    return key_values
+
 def write_text_file(file_path, text):
     with open(file_path, "w", encoding="utf-8") as file:
         file.write(text)
@@ -141,6 +191,7 @@ text = {
         "exit": "Exit",
         "send": "Send Message",
         "show": "Show Message",
+        "sign": "Sign / Verify",
         "close": "Close App",
         "theme_labels": {"system": "System", "light": "Light", "dark": "Dark"},
         
@@ -164,7 +215,7 @@ text = {
         "contact_linkedin": "My LinkedIn",
         "contact_email": "Email",
         "about_algo_text": "RSA algorithm:\nAn asymmetric cryptosystem with two keys – one for encryption (public) and one for decryption (private).",
-        "about_app_text": "This app generates keys automatically. When encrypting it saves:\n• the encrypted message (numbers)\n• a public key file (n,e)\n• a private key file (n,d)\n\nTo actually show/decrypt the message later, choose the PRIVATE key file.",
+        "about_app_text": "This app generates keys automatically. When encrypting it saves:\n• the encrypted message (numbers)\n• a public key file (n,e)\n• a private key file (n,d)\n\nTo actually show/decrypt the message later, choose the PRIVATE key file.\nTo encrypt for other people, add their PUBLIC key files as recipients.",
         
         "custom_title": "Custom Theme",
         "custom_bg": "Background color",
@@ -187,6 +238,13 @@ text = {
         "interval_err_start": "start must be ≥ 2.",
         "interval_err_gap": "end must be at least 6 greater than start.",
         "interval_err_max": "Max end is 1,000,000.",
+        "interval_primes": "Primes per key",
+        "interval_primes_hint": "≥ 2",
+        "interval_err_primes": "Primes per key must be at least 2.",
+        "interval_err_few_primes": "This range does not contain enough primes.",
+        "interval_err_key_size": "Key size is too small for this many primes.",
+        "key_size": "Key size (bits)",
+        "key_size_range": "Use range",
         "interval_saved": "Range saved.",
         "save": "Save",
         
@@ -200,16 +258,48 @@ text = {
         "only_formats": "Only txt/pdf/docx(dox) allowed.",
         "key_save_fail": "Key file save failed:\n{err}",
         "enc_done": "Encrypted & saved.",
+        "pick_recipients": "Recipients…",
+        "recipients_count": "{count} recipient(s)",
+        "need_public": "Selected file is not a public key file (n,e).",
+        "mode_multi": "Multi-recipient (hybrid)",
+        "compression": "Compress:",
+        "compress_none": "None",
+        "encrypt_direct": "Encrypt file directly",
+        "direct_txt_only": "Direct file encryption saves to .txt only.",
+        "container_modes": "The binary .rsac format supports per-character and block modes only.",
+        "armor": "Compact text",
+        "armor_no_direct": "Compact text output is not available with direct file encryption.",
+        "enc_mode": "Mode:",
+        "mode_char": "Per character",
+        "mode_block": "Block (UTF-8 packed)",
+        "mode_hybrid": "Hybrid (RSA + AES-GCM)",
+        "mode_hybrid_fallback": "Hybrid (RSA + SHAKE/HMAC)",
         
         "pick_key": "Choose Key File…",
         "pick_msg": "Choose Message File…",
         "read_show": "Read & Show",
         "need_private": "Selected key file seems public-only. Decryption needs private key (n,d).",
         "dec_fail": "Failed to decrypt. Showing raw content.",
+        "decrypt_direct": "Decrypt to file",
+        "preview_range": "Characters:",
+        "preview": "Preview",
+        "preview_err_range": "Preview range must be two integers.",
+        "preview_txt_only": "Preview works on .txt and .rsac messages only.",
         "export": "Export…",
         "saved": "Saved.",
         "decrypting": "Decrypting...",
+        "encrypting": "Encrypting...",
         "nothing_export": "Nothing to export.",
+        
+        "verify": "Verify",
+        "pick_document": "Choose Document…",
+        "pick_signature": "Choose Signature…",
+        "need_private_sign": "Signing needs a private key file (n,d).",
+        "signing": "Signing...",
+        "verifying": "Verifying...",
+        "sign_done": "Signature file saved.",
+        "verify_ok": "Signature is valid.",
+        "verify_fail": "Signature is NOT valid for this document and key.",
     },
     "fa": {
         "about": "درباره",
@@ -221,6 +311,7 @@ text = {
         "exit": "خروج",
         "send": "ارسال پیام",
         "show": "نمایش پیام",
+        "sign": "امضا / تایید",
         "close": "بستن برنامه",
         "theme_labels": {"system": "سیستمی", "light": "روشن", "dark": "تیره"},
         
@@ -244,7 +335,7 @@ text = {
         "contact_linkedin": "لینکدین",
         "contact_email": "ایمیل",
         "about_algo_text": "الگوریتم RSA:\nیک رمزنگاری نامتقارن با دو کلید؛ یکی برای رمزنگاری (عمومی) و دیگری برای رمزگشایی (خصوصی).",
-        "about_app_text": "این برنامه کلیدها را خودکار می‌سازد. هنگام رمزنگاری ذخیره می‌شود:\n• متن رمز شده (رشته‌ای از اعداد)\n• فایل کلید عمومی (n,e)\n• فایل کلید خصوصی (n,d)\n\nبرای نمایش/رمزگشایی واقعی پیام، باید «کلید خصوصی» را انتخاب کنید.",
+        "about_app_text": "این برنامه کلیدها را خودکار می‌سازد. هنگام رمزنگاری ذخیره می‌شود:\n• متن رمز شده (رشته‌ای از اعداد)\n• فایل کلید عمومی (n,e)\n• فایل کلید خصوصی (n,d)\n\nبرای نمایش/رمزگشایی واقعی پیام، باید «کلید خصوصی» را انتخاب کنید.\nبرای رمزنگاری برای دیگران، فایل «کلید عمومی» آن‌ها را به‌عنوان گیرنده اضافه کنید.",
         
         "custom_title": "پوسته‌ی سفارشی",
         "custom_bg": "رنگ پس‌زمینه",
@@ -267,6 +358,13 @@ text = {
         "interval_err_start": "شروع باید ≥ 2 باشد.",
         "interval_err_gap": "پایان باید حداقل ۶ عدد از شروع بزرگ‌تر باشد.",
         "interval_err_max": "حداکثر پایان برابر ۱,۰۰۰,۰۰۰ است.",
+        "interval_primes": "تعداد عامل‌های اول",
+        "interval_primes_hint": "≥ 2",
+        "interval_err_primes": "تعداد عامل‌های اول باید حداقل ۲ باشد.",
+        "interval_err_few_primes": "این بازه به اندازه‌ی کافی عدد اول ندارد.",
+        "interval_err_key_size": "اندازه‌ی کلید برای این تعداد عامل اول کوچک است.",
+        "key_size": "اندازه‌ی کلید (بیت)",
+        "key_size_range": "استفاده از بازه",
         "interval_saved": "بازه ذخیره شد.",
         "save": "ذخیره",
         
@@ -280,16 +378,48 @@ text = {
         "only_formats": "فقط فرمت‌های txt/pdf/docx(dox) مجازند.",
         "key_save_fail": "ذخیره فایل کلید ناموفق بود:\n{err}",
         "enc_done": "رمزنگاری و ذخیره انجام شد.",
+        "pick_recipients": "گیرنده‌ها…",
+        "recipients_count": "{count} گیرنده",
+        "need_public": "فایل انتخاب‌شده کلید عمومی (n,e) نیست.",
+        "mode_multi": "چندگیرنده‌ای (ترکیبی)",
+        "compression": "فشرده‌سازی:",
+        "compress_none": "بدون",
+        "encrypt_direct": "رمزنگاری مستقیم فایل",
+        "direct_txt_only": "رمزنگاری مستقیم فایل فقط در قالب .txt ذخیره می‌شود.",
+        "container_modes": "قالب دودویی .rsac فقط حالت‌های کاراکتری و بلوکی را پشتیبانی می‌کند.",
+        "armor": "متن فشرده",
+        "armor_no_direct": "خروجی متن فشرده با رمزنگاری مستقیم فایل در دسترس نیست.",
+        "enc_mode": "حالت:",
+        "mode_char": "کاراکتر به کاراکتر",
+        "mode_block": "بلوکی (UTF-8 فشرده)",
+        "mode_hybrid": "ترکیبی (RSA + AES-GCM)",
+        "mode_hybrid_fallback": "ترکیبی (RSA + SHAKE/HMAC)",
         
         "pick_key": "انتخاب فایل کلید…",
         "pick_msg": "انتخاب فایل پیام…",
         "read_show": "خواندن و نمایش",
         "need_private": "فایل کلید ظاهراً فقط عمومی است. برای رمزگشایی به کلید خصوصی (n,d) نیاز است.",
         "dec_fail": "رمزگشایی انجام نشد؛ محتوای خام نمایش داده شد.",
+        "decrypt_direct": "رمزگشایی در فایل",
+        "preview_range": "نویسه‌ها:",
+        "preview": "پیش‌نمایش",
+        "preview_err_range": "بازه‌ی پیش‌نمایش باید دو عدد صحیح باشد.",
+        "preview_txt_only": "پیش‌نمایش فقط برای پیام‌های .txt و .rsac ممکن است.",
         "export": "خروجی گرفتن…",
         "saved": "ذخیره شد.",
         "decrypting": "در حال رمزگشایی...",
+        "encrypting": "در حال رمزنگاری...",
         "nothing_export": "چیزی برای خروجی نیست.",
+        
+        "verify": "تایید",
+        "pick_document": "انتخاب سند…",
+        "pick_signature": "انتخاب فایل امضا…",
+        "need_private_sign": "برای امضا به فایل کلید خصوصی (n,d) نیاز است.",
+        "signing": "در حال امضا...",
+        "verifying": "در حال بررسی امضا...",
+        "sign_done": "فایل امضا ذخیره شد.",
+        "verify_ok": "امضا معتبر است.",
+        "verify_fail": "امضا برای این سند و کلید معتبر نیست.",
     },
 }
 
@@ -315,8 +445,9 @@ def parse_cli():
     parser = argparse.ArgumentParser()
     parser.add_argument('--lang', choices=['en', 'fa'], default='en')
     parser.add_argument('--appearance', choices=['system', 'light', 'dark'], default='system')
+    parser.add_argument('--timing', action='store_true', help='print startup time')
     args = parser.parse_args()
-    return args.lang, args.appearance
+    return args.lang, args.appearance, args.timing
 
 def is_valid_hex_color(color_string):
     if not color_string or not isinstance(color_string, str):
@@ -3,7 +3,12 @@ import tkinter as tk
 from tkinter import filedialog
 from CTkMessagebox import CTkMessagebox
 import setting
-from myrsa import RSA
+import io
+import os
+from myrsa import (
+    RSA, STREAM_CHUNK, CONTAINER_MAGIC, TokenParser, is_armored, normalize_separators, is_container,
+)
+from itertools import chain
 import threading
 
 class ProgressWindow(ctk.CTkToplevel):
@@ -45,6 +50,13 @@ class ProgressWindow(ctk.CTkToplevel):
         except:
             pass
 
+    def report_progress(self, value):
+        # از ریسه‌ی کاری صدا زده می‌شود؛ به‌روزرسانی به حلقه‌ی رویداد Tk سپرده می‌شود
+        try:
+            self.after(0, lambda: self.update_progress_value(value))
+        except:
+            pass
+
     def apply_parent_theme(self, parent):
         try:
             if hasattr(parent, 'custom_colors') and parent.custom_colors["bg"]:
@@ -62,6 +74,9 @@ class ProgressWindow(ctk.CTkToplevel):
             pass
 
 class ShowWindow(ctk.CTkToplevel):
+    STREAM_BUFFER = STREAM_CHUNK
+    PREVIEW_SIZE = 2000
+
     def __init__(self, parent):
         super().__init__(parent)
         self.setup_window(parent)
@@ -75,19 +90,20 @@ class ShowWindow(ctk.CTkToplevel):
         self.grab_set()
         self.resizable(True, True)
         
-        w, h = 720, 520
+        w, h = 720, 560
         x = parent.winfo_rootx() + (parent.winfo_width() - w) // 2
         y = parent.winfo_rooty() + (parent.winfo_height() - h) // 2
         self.geometry(f"{w}x{h}+{x}+{y}")
         
         self.grid_columnconfigure(0, weight=1)
-        self.grid_rowconfigure(2, weight=1)
+        self.grid_rowconfigure(3, weight=1)
 
         self.protocol("WM_DELETE_WINDOW", self.safe_close)
 
     def create_interface(self):
         self.create_key_file_row()
         self.create_message_file_row()
+        self.create_preview_row()
         self.create_text_display_area()
         self.create_export_button()
 
@@ -127,15 +143,41 @@ class ShowWindow(ctk.CTkToplevel):
             command=self.read_and_display_message
         ).pack(side="left", padx=8)
         
+        self.direct_var = tk.BooleanVar(value=False)
+        
+        ctk.CTkCheckBox(
+            message_row, 
+            text=self.parent.translate("decrypt_direct"),
+            variable=self.direct_var
+        ).pack(side="left", padx=8)
+        
         ctk.CTkLabel(
             message_row, 
             textvariable=self.message_file_path, 
             text_color=("gray20", "#bbb")
         ).pack(side="left", padx=8)
 
+    def create_preview_row(self):
+        preview_row = ctk.CTkFrame(self, fg_color="transparent")
+        preview_row.grid(row=2, column=0, sticky="ew", padx=12, pady=6)
+        
+        self.preview_start = tk.StringVar(value="0")
+        self.preview_end = tk.StringVar(value=str(self.PREVIEW_SIZE))
+        
+        ctk.CTkLabel(preview_row, text=self.parent.translate("preview_range")).pack(side="left")
+        ctk.CTkEntry(preview_row, width=90, textvariable=self.preview_start).pack(side="left", padx=(8, 4))
+        ctk.CTkLabel(preview_row, text="–").pack(side="left")
+        ctk.CTkEntry(preview_row, width=90, textvariable=self.preview_end).pack(side="left", padx=(4, 8))
+        
+        ctk.CTkButton(
+            preview_row, 
+            text=self.parent.translate("preview"),
+            command=self.preview_message_range
+        ).pack(side="left", padx=8)
+
     def create_text_display_area(self):
         self.text_display = ctk.CTkTextbox(self, height=360)
-        self.text_display.grid(row=2, column=0, sticky="nsew", padx=12, pady=6)
+        self.text_display.grid(row=3, column=0, sticky="nsew", padx=12, pady=6)
 
     def create_export_button(self):
         ctk.CTkButton(
@@ -144,7 +186,7 @@ class ShowWindow(ctk.CTkToplevel):
             fg_color=setting.primary_bg, 
             hover_color=setting.primary_abg,
             command=self.export_displayed_text
-        ).grid(row=3, column=0, padx=12, pady=10, sticky="e")
+        ).grid(row=4, column=0, padx=12, pady=10, sticky="e")
 
     def select_key_file(self):
         try:
@@ -175,23 +217,7 @@ class ShowWindow(ctk.CTkToplevel):
             print(f"خطا در select_message_file: {e}")
 
     def extract_key_values(self, key_file_content):
-        key_values = {}
-        
-        for line in key_file_content.replace("\r", "").split("\n"):
-            if "=" in line:
-                key, value = line.split("=", 1)
-                key = key.strip().lower()
-                value = value.strip()
-                
-                try:
-                    if value.isdigit():
-                        key_values[key] = int(value)
-                    else:
-                        key_values[key] = int(value.replace(",", ""))
-                except:
-                    pass
-        
-        return key_values
+        return setting.parse_key_values(key_file_content)
 
     def read_and_display_message(self):
         try:
@@ -215,15 +241,38 @@ class ShowWindow(ctk.CTkToplevel):
             except Exception:
                 key_values = {}
 
+            message_is_container = self.is_container_file(message_path)
+            has_private_key = "n" in key_values and "d" in key_values
+
+            if self.direct_var.get():
+                # متن رمز هرگز کامل در حافظه یا جعبه‌ی متن بارگذاری نمی‌شود
+                if not has_private_key:
+                    self.show_info("need_private")
+                    return
+                
+                output_path = self.get_output_location()
+                if output_path:
+                    self.start_stream_decryption(message_path, output_path, key_values)
+                return
+
+            if has_private_key and self.is_mappable_file(message_path):
+                self.start_mapped_decryption(message_path, key_values)
+                return
+
             try:
-                message_content = setting.read_text_any(message_path)
+                if message_is_container:
+                    with open(message_path, "rb") as file:
+                        message_content = file.read()
+                else:
+                    message_content = setting.read_text_any(message_path)
             except Exception as e:
                 self.show_error(str(e))
                 return
 
-            if "n" not in key_values or "d" not in key_values:
+            if not has_private_key:
                 self.show_info("need_private")
-                self.display_text(message_content)
+                if not message_is_container:
+                    self.display_text(message_content)
                 return
 
             self.start_decryption_process(message_content, key_values)
@@ -231,7 +280,58 @@ class ShowWindow(ctk.CTkToplevel):
         except Exception as e:
             print(f"خطا در read_and_display_message: {e}")
 
-    def start_decryption_process(self, raw_content, key_values):
+    def preview_message_range(self):
+        try:
+            if not self.winfo_exists():
+                return
+            
+            key_path = self.key_file_path.get().strip()
+            message_path = self.message_file_path.get().strip()
+            
+            if not key_path:
+                self.show_notice("pick_key")
+                return
+                
+            if not message_path:
+                self.show_notice("pick_msg")
+                return
+
+            # فهرست فقط برای متن ساده و قالب دودویی معنا دارد؛ از بایت‌های zip/pdf فهرست ساخته نشود
+            if not self.is_mappable_file(message_path):
+                self.show_notice("preview_txt_only")
+                return
+
+            try:
+                start = int(self.preview_start.get())
+                end = int(self.preview_end.get())
+            except ValueError:
+                self.show_notice("preview_err_range")
+                return
+
+            try:
+                key_values = self.extract_key_values(setting.read_text_any(key_path))
+            except Exception:
+                key_values = {}
+
+            if "n" not in key_values or "d" not in key_values:
+                self.show_info("need_private")
+                return
+
+            def preview_thread():
+                try:
+                    # فقط همین بازه خوانده و رمزگشایی می‌شود؛ فهرست کناری در صورت نبود ساخته می‌شود
+                    text = RSA.from_key_values(key_values).decrypt_range(message_path, start, end)
+                    self.after(0, lambda: self.display_text(text))
+                except Exception as e:
+                    error = str(e)
+                    self.after(0, lambda: self.show_error(error))
+
+            threading.Thread(target=preview_thread, daemon=True).start()
+            
+        except Exception as e:
+            print(f"خطا در preview_message_range: {e}")
+
+    def start_mapped_decryption(self, message_path, key_values):
         try:
             progress_window = ProgressWindow(
                 self, 
@@ -243,24 +343,68 @@ class ShowWindow(ctk.CTkToplevel):
             
             def decryption_thread():
                 try:
-                    numbers = self.parse_encrypted_numbers(raw_content)
+                    # فایل نگاشته می‌شود و فقط متن رمزگشایی‌شده در حافظه ساخته می‌شود
+                    output = io.StringIO()
+                    RSA.from_key_values(key_values).decrypt_file(
+                        message_path, output, progress=progress_window.report_progress, buffer_size=self.STREAM_BUFFER
+                    )
+                    decrypted_text = output.getvalue()
                     
-                    rsa_instance = RSA()
-                    rsa_instance.n = key_values["n"]
-                    rsa_instance.d = key_values["d"]
-                    rsa_instance.e = key_values.get("e", 65537)
+                    self.after(0, lambda: self.complete_decryption(
+                        decrypted_text, progress_window, True
+                    ))
                     
-                    decrypted_text = self.decrypt_with_progress(
-                        numbers, rsa_instance, progress_window
-                    )
+                except Exception as e:
+                    error = str(e)
+                    try:
+                        shown_content = "" if self.is_container_file(message_path) else setting.read_text_any(message_path)
+                    except Exception:
+                        shown_content = ""
+                    self.after(0, lambda: self.complete_decryption(
+                        shown_content, progress_window, False, error
+                    ))
+
+            threading.Thread(target=decryption_thread, daemon=True).start()
+            
+        except Exception as e:
+            print(f"خطا در start_mapped_decryption: {e}")
+
+    def start_decryption_process(self, raw_content, key_values):
+        try:
+            progress_window = ProgressWindow(
+                self, 
+                self.parent.translate("info"), 
+                self.parent.translate("decrypting")
+            )
+            
+            self.grab_release()
+            
+            def decryption_thread():
+                try:
+                    rsa_instance = RSA.from_key_values(key_values)
+                    
+                    if isinstance(raw_content, bytes):
+                        decrypted_text = self.decrypt_container_with_progress(
+                            raw_content, rsa_instance, progress_window
+                        )
+                    elif is_armored(raw_content):
+                        decrypted_text = rsa_instance.decrypt_armored(raw_content)
+                    else:
+                        numbers = self.parse_encrypted_numbers(raw_content)
+                        
+                        decrypted_text = self.decrypt_with_progress(
+                            numbers, rsa_instance, progress_window
+                        )
                     
                     self.after(0, lambda: self.complete_decryption(
                         decrypted_text, progress_window, True
                     ))
                     
-                except Exception:
+                except Exception as e:
+                    error = str(e)
+                    shown_content = raw_content if isinstance(raw_content, str) else ""
                     self.after(0, lambda: self.complete_decryption(
-                        raw_content, progress_window, False
+                        shown_content, progress_window, False, error
                     ))
 
             threading.Thread(target=decryption_thread, daemon=True).start()
@@ -268,36 +412,100 @@ class ShowWindow(ctk.CTkToplevel):
         except Exception as e:
             print(f"خطا در start_decryption_process: {e}")
 
-    def parse_encrypted_numbers(self, content):
-        numbers = []
-        
-        clean_content = content.replace("\n", " ").replace("\t", " ")
-        
-        for token in clean_content.split():
-            for part in token.split(","):
-                part = part.strip()
-                if part:
-                    numbers.append(int(part))
-        
-        return numbers
+    def is_container_file(self, file_path):
+        try:
+            with open(file_path, "rb") as file:
+                return is_container(file.read(len(CONTAINER_MAGIC)))
+        except OSError:
+            return False
+
+    def is_mappable_file(self, file_path):
+        # فایل‌های متنی ساده و قالب دودویی مستقیما از روی mmap توکن می‌شوند؛ pdf/docx نه
+        return setting.get_file_extension(file_path) == ".txt" or self.is_container_file(file_path)
+
+    def get_output_location(self):
+        return filedialog.asksaveasfilename(
+            title=self.parent.translate("save_output"),
+            defaultextension=".txt",
+            filetypes=[("Text", "*.txt")]
+        )
 
-    def decrypt_with_progress(self, numbers, rsa_instance, progress_window):
-        total_numbers = max(1, len(numbers))
-        decrypted_chars = []
-        chunk_size = max(1, total_numbers // 100)
-        
-        for i in range(0, total_numbers, chunk_size):
-            chunk = numbers[i:i + chunk_size]
+    def start_stream_decryption(self, message_path, output_path, key_values):
+        try:
+            progress_window = ProgressWindow(
+                self, 
+                self.parent.translate("info"), 
+                self.parent.translate("decrypting")
+            )
             
-            for number in chunk:
-                decrypted_chars.append(chr(pow(int(number), rsa_instance.d, rsa_instance.n)))
+            self.grab_release()
             
-            progress = min(1.0, (i + chunk_size) / total_numbers)
-            self.after(0, lambda p=progress: progress_window.update_progress_value(p))
-        
-        return "".join(decrypted_chars)
+            def decryption_thread():
+                error = None
+                try:
+                    rsa_instance = RSA.from_key_values(key_values)
+                    
+                    if self.is_mappable_file(message_path):
+                        with open(output_path, "w", encoding="utf-8") as output:
+                            rsa_instance.decrypt_file(
+                                message_path, output, progress=progress_window.report_progress, buffer_size=self.STREAM_BUFFER
+                            )
+                    else:
+                        chunks = setting.iter_text_chunks(message_path, self.STREAM_BUFFER)
+                        first_chunk = next(chunks, "")
+                        if is_armored(first_chunk):
+                            # متن زره‌پوش فشرده است و فقط یکجا باز می‌شود
+                            decrypted_text = rsa_instance.decrypt_armored(first_chunk + "".join(chunks))
+                            setting.write_text_file(output_path, decrypted_text)
+                        else:
+                            with open(output_path, "w", encoding="utf-8") as output:
+                                rsa_instance.decrypt_stream(
+                                    chain([first_chunk], chunks), output,
+                                    progress=progress_window.report_progress, total=os.path.getsize(message_path),
+                                    buffer_size=self.STREAM_BUFFER
+                                )
+                except Exception as e:
+                    error = str(e)
+                    # متن نیمه‌کاره‌ی رمزگشایی‌شده نباید به‌جای خروجی کامل باقی بماند
+                    if os.path.exists(output_path):
+                        os.remove(output_path)
+                
+                self.after(0, lambda: self.complete_stream_decryption(progress_window, error))
+
+            threading.Thread(target=decryption_thread, daemon=True).start()
+            
+        except Exception as e:
+            print(f"خطا در start_stream_decryption: {e}")
+
+    def complete_stream_decryption(self, progress_window, error):
+        try:
+            if progress_window and progress_window.winfo_exists():
+                progress_window.safe_close()
+            
+            if not self.winfo_exists():
+                return
+            
+            self.grab_set()
+            
+            if error:
+                self.show_error(error)
+            else:
+                self.show_success("saved")
+                
+        except Exception as e:
+            print(f"خطا در complete_stream_decryption: {e}")
+
+    def parse_encrypted_numbers(self, content):
+        # توکن نامعتبر با موقعیتش گزارش می‌شود، نه اینکه بی‌صدا نادیده گرفته شود
+        return TokenParser().parse(normalize_separators(content).encode("utf-8"))
+
+    def decrypt_with_progress(self, numbers, rsa_instance, progress_window):
+        return rsa_instance.decrypt_message(numbers, progress=progress_window.report_progress)
+
+    def decrypt_container_with_progress(self, data, rsa_instance, progress_window):
+        return rsa_instance.decrypt_container(data, progress=progress_window.report_progress)
 
-    def complete_decryption(self, text_content, progress_window, success):
+    def complete_decryption(self, text_content, progress_window, success, error=None):
         try:
             if progress_window and progress_window.winfo_exists():
                 progress_window.safe_close()
@@ -307,7 +515,10 @@ class ShowWindow(ctk.CTkToplevel):
                 
                 self.display_text(text_content)
                 
-                if not success:
+                if not success and error:
+                    # علت خطا (مثلا موقعیت توکن نامعتبر) هم نمایش داده می‌شود
+                    self.show_error(f"{self.parent.translate('dec_fail')}\n{error}")
+                elif not success:
                     self.show_warning("dec_fail")
                     
         except Exception as e:
@@ -0,0 +1,310 @@
+import customtkinter as ctk
+import tkinter as tk
+from tkinter import filedialog
+from CTkMessagebox import CTkMessagebox
+import setting
+from myrsa import RSA
+from show_window import ProgressWindow
+import threading
+
+class SignWindow(ctk.CTkToplevel):
+    SIGNATURE_EXT = ".sig"
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setup_window(parent)
+        self.create_interface()
+        self.apply_parent_theme()
+
+    def setup_window(self, parent):
+        self.parent = parent
+        self.title(parent.translate("sign"))
+        self.transient(parent)
+        self.grab_set()
+        self.resizable(False, False)
+
+        w, h = 560, 230
+        x = parent.winfo_rootx() + (parent.winfo_width() - w) // 2
+        y = parent.winfo_rooty() + (parent.winfo_height() - h) // 2
+        self.geometry(f"{w}x{h}+{x}+{y}")
+
+        self.protocol("WM_DELETE_WINDOW", self.safe_close)
+
+    def create_interface(self):
+        frame = ctk.CTkFrame(self, corner_radius=12)
+        frame.pack(fill="both", expand=True, padx=12, pady=12)
+
+        self.document_path = tk.StringVar(value="")
+        self.key_file_path = tk.StringVar(value="")
+        self.signature_path = tk.StringVar(value="")
+
+        self.create_file_row(frame, "pick_document", self.document_path)
+        self.create_file_row(frame, "pick_key", self.key_file_path)
+        self.create_file_row(frame, "pick_signature", self.signature_path)
+        self.create_buttons(frame)
+
+    def create_file_row(self, parent, text_key, path_var):
+        row = ctk.CTkFrame(parent, fg_color="transparent")
+        row.pack(fill="x", pady=6)
+
+        ctk.CTkButton(
+            row,
+            text=self.parent.translate(text_key),
+            command=lambda: self.select_file(text_key, path_var)
+        ).pack(side="left")
+
+        ctk.CTkLabel(
+            row,
+            textvariable=path_var,
+            text_color=("gray20", "#bbb")
+        ).pack(side="left", padx=8)
+
+    def create_buttons(self, parent):
+        buttons_frame = ctk.CTkFrame(parent, fg_color="transparent")
+        buttons_frame.pack(fill="x", pady=(10, 0))
+
+        ctk.CTkButton(
+            buttons_frame,
+            text=self.parent.translate("verify"),
+            width=100,
+            command=self.verify_document
+        ).pack(side="right", padx=6)
+
+        ctk.CTkButton(
+            buttons_frame,
+            text=self.parent.translate("sign"),
+            width=100,
+            fg_color=setting.primary_bg,
+            hover_color=setting.primary_abg,
+            command=self.sign_document
+        ).pack(side="right")
+
+    def select_file(self, text_key, path_var):
+        try:
+            file_path = filedialog.askopenfilename(
+                title=self.parent.translate(text_key),
+                filetypes=[("All", "*.*")]
+            )
+            if file_path:
+                path_var.set(file_path)
+        except Exception as e:
+            print(f"خطا در select_file: {e}")
+
+    def get_signature_path(self, document_path):
+        return self.signature_path.get().strip() or document_path + self.SIGNATURE_EXT
+
+    def read_inputs(self):
+        document_path = self.document_path.get().strip()
+        key_path = self.key_file_path.get().strip()
+
+        if not document_path:
+            self.show_notice("pick_document")
+            return None, None
+
+        if not key_path:
+            self.show_notice("pick_key")
+            return None, None
+
+        try:
+            key_values = setting.parse_key_values(setting.read_text_any(key_path))
+        except Exception:
+            key_values = {}
+
+        if "n" not in key_values:
+            self.show_notice("pick_key")
+            return None, None
+
+        return document_path, key_values
+
+    def sign_document(self):
+        try:
+            if not self.winfo_exists():
+                return
+
+            document_path, key_values = self.read_inputs()
+            if document_path is None:
+                return
+
+            if "d" not in key_values:
+                self.show_notice("need_private_sign")
+                return
+
+            signature_path = self.get_signature_path(document_path)
+
+            def work(report):
+                rsa_instance = RSA.from_key_values(key_values)
+                signature = rsa_instance.sign_file(document_path, progress=report)
+                self.save_signature_file(signature_path, rsa_instance, signature)
+                return True
+
+            self.start_process("signing", work, "sign_done")
+
+        except Exception as e:
+            print(f"خطا در sign_document: {e}")
+
+    def verify_document(self):
+        try:
+            if not self.winfo_exists():
+                return
+
+            document_path, key_values = self.read_inputs()
+            if document_path is None:
+                return
+
+            try:
+                signature_values = setting.parse_key_values(
+                    setting.read_text_file(self.get_signature_path(document_path))
+                )
+            except Exception:
+                signature_values = {}
+
+            if "s" not in signature_values:
+                self.show_notice("pick_signature")
+                return
+
+            def work(report):
+                # امضایی که با کلید دیگری ساخته شده، حتی اگر درست باشد، برای این کلید معتبر نیست
+                if signature_values.get("n", key_values["n"]) != key_values["n"]:
+                    return False
+                # توان عمومی فقط از فایل کلید (یا پیش‌فرض 65537) می‌آید؛ فایل امضا قابل اعتماد نیست
+                rsa_instance = RSA.from_key_values(key_values)
+                if signature_values.get("e", rsa_instance.e) != rsa_instance.e:
+                    return False
+                return rsa_instance.verify_file(document_path, signature_values["s"], progress=report)
+
+            self.start_process("verifying", work, "verify_ok", "verify_fail")
+
+        except Exception as e:
+            print(f"خطا در verify_document: {e}")
+
+    def save_signature_file(self, signature_path, rsa_instance, signature):
+        lines = [
+            "# RSA signature (SHA-256)",
+            f"n={rsa_instance.n}",
+            f"e={rsa_instance.e}",
+            f"s={signature}",
+        ]
+        setting.write_text_file(signature_path, "\n".join(lines))
+
+    def start_process(self, message_key, work, success_key, failure_key=None):
+        progress_window = ProgressWindow(
+            self,
+            self.parent.translate("info"),
+            self.parent.translate(message_key)
+        )
+
+        self.grab_release()
+
+        def process_thread():
+            error = None
+            result = False
+            try:
+                result = work(progress_window.report_progress)
+            except Exception as e:
+                error = e
+
+            self.after(0, lambda: self.complete_process(
+                progress_window, result, error, success_key, failure_key
+            ))
+
+        threading.Thread(target=process_thread, daemon=True).start()
+
+    def complete_process(self, progress_window, result, error, success_key, failure_key):
+        try:
+            if progress_window and progress_window.winfo_exists():
+                progress_window.safe_close()
+
+            if not self.winfo_exists():
+                return
+
+            self.grab_set()
+
+            if error is not None:
+                self.show_error(str(error))
+            elif result:
+                self.show_success(success_key)
+            else:
+                self.show_warning(failure_key)
+
+        except Exception as e:
+            print(f"خطا در complete_process: {e}")
+
+    def show_notice(self, message_key):
+        msg = CTkMessagebox(
+            master=self,
+            title=self.parent.translate("notice"),
+            message=self.parent.translate(message_key),
+            icon="warning",
+            option_1="OK"
+        )
+        msg.get()
+
+    def show_warning(self, message_key):
+        msg = CTkMessagebox(
+            master=self,
+            title=self.parent.translate("warning"),
+            message=self.parent.translate(message_key),
+            icon="warning",
+            option_1="OK"
+        )
+        msg.get()
+
+    def show_error(self, message_text):
+        msg = CTkMessagebox(
+            master=self,
+            title=self.parent.translate("error"),
+            message=message_text,
+            icon="warning",
+            option_1="OK"
+        )
+        msg.get()
+
+    def show_success(self, message_key):
+        msg = CTkMessagebox(
+            master=self,
+            title=self.parent.translate("success"),
+            message=self.parent.translate(message_key),
+            icon="check",
+            option_1="OK"
+        )
+        msg.get()
+
+    def safe_close(self):
+        try:
+            if self.grab_current() == self:
+                self.grab_release()
+
+            try:
+                self.parent.focus_set()
+            except:
+                pass
+
+            self.destroy()
+        except:
+            pass
+
+    def apply_parent_theme(self):
+        try:
+            if hasattr(self.parent, 'custom_colors') and self.parent.custom_colors["bg"]:
+                bg = self.parent.custom_colors["bg"]
+                self.configure(fg_color=bg)
+
+            if hasattr(self.parent, 'fonts'):
+                family = self.parent.fonts["fa"] if self.parent.lang == "fa" else self.parent.fonts["en"]
+                font_tuple = (family, self.parent.fonts["size"])
+                self.apply_font_to_all_widgets(self, font_tuple)
+        except:
+            pass
+
+    def apply_font_to_all_widgets(self, widget, font_tuple):
+        try:
+            if widget.winfo_exists():
+                widget.configure(font=font_tuple)
+        except:
+            pass
+
+        try:
+            for child in widget.winfo_children():
+                self.apply_font_to_all_widgets(child, font_tuple)
+        except:
+            pass